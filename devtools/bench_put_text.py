@@ -0,0 +1,47 @@
+"""
+Бенчмарк PILFrame.put_text: фон текста смешивается только в своей области,
+поэтому время на кадр не должно зависеть от разрешения.
+
+Запуск: uv run python devtools/bench_put_text.py
+"""
+
+import timeit
+
+from PIL import Image
+
+from vta_video_overlay.enums import Alignment
+from vta_video_overlay.pil_frame import PILFrame
+
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+# Шесть строк, как в make_frame
+LINES = [
+    "t(s): 123.4",
+    "E(mV): -1.23",
+    "T(°C): 345",
+    "dT/dt(°C/s): -6.78",
+    "Sample: Pt",
+    "Operator: Ivanov",
+]
+REPEATS = 20
+
+
+def draw_lines(frame: PILFrame):
+    for i, text in enumerate(LINES):
+        frame.put_text(text=text, xy=(5, 5 + i * 75), align=Alignment.TOP_LEFT)
+
+
+def main():
+    print(f"{'resolution':>10} | {'ms/frame':>8}")
+    for name, size in RESOLUTIONS.items():
+        frame = PILFrame(image=Image.new("RGB", size, (40, 80, 120)))
+        draw_lines(frame)  # прогрев шрифтового кэша FreeType
+        elapsed = timeit.timeit(lambda: draw_lines(frame), number=REPEATS)
+        print(f"{name:>10} | {elapsed / REPEATS * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,20 @@ assets\MainWindow.ui ^
 assets\CropSelectionWindow.ui ^
 vta_video_overlay\__main__.py ^
 vta_video_overlay\about_window.py ^
-vta_video_overlay\controller.py ^
 vta_video_overlay\config.py ^
+vta_video_overlay\controller.py ^
 vta_video_overlay\crop_selection_window.py ^
+vta_video_overlay\data_file.py ^
 vta_video_overlay\ffmpeg_utils.py ^
+vta_video_overlay\graph_preview_dialog.py ^
 vta_video_overlay\main_window.py ^
+vta_video_overlay\make_frame.py ^
 vta_video_overlay\opencv_frame.py ^
 vta_video_overlay\opencv_processor.py ^
 vta_video_overlay\pil_frame.py ^
 vta_video_overlay\pipeline.py ^
+vta_video_overlay\segment_processor.py ^
+vta_video_overlay\stream_processor.py ^
 vta_video_overlay\tda_file.py ^
 vta_video_overlay\video_data.py ^
 -ts translation_ru.ts
@@ -78,15 +78,15 @@ Temperature (C): {temp:.0f}</source>
     </message>
     <message>
         <source>Frame read failed | Frame: {} | Pos: {:.1f}s</source>
-        <translation>Не удалось прочитать кадр | кадр: {} | поз.: {:.1f}s</translation>
+        <translation type="vanished">Не удалось прочитать кадр | кадр: {} | поз.: {:.1f}s</translation>
     </message>
     <message>
         <source>Operator: {operator}</source>
-        <translation>Оператор: {operator}</translation>
+        <translation type="vanished">Оператор: {operator}</translation>
     </message>
     <message>
         <source>Sample: {sample}</source>
-        <translation>Образец: {sample}</translation>
+        <translation type="vanished">Образец: {sample}</translation>
     </message>
     <message>
         <source>t(s): {time:.1f}</source>
@@ -102,7 +102,7 @@ Temperature (C): {temp:.0f}</source>
     </message>
     <message>
         <source>Video resolution: {size}</source>
-        <translation>Разрешение видео: {size}</translation>
+        <translation type="vanished">Разрешение видео: {size}</translation>
     </message>
     <message>
         <source>OpenCV has finished</source>
@@ -121,11 +121,11 @@ Temperature (C): {temp:.0f}</source>
     </message>
     <message>
         <source>TDA file load failed | Path: {} | Temp Enabled: {} | Error: {}</source>
-        <translation>Не удалось загрузить файл TDA | Путь: {} | Калибровка включена: {} | Ошибка: {}</translation>
+        <translation type="vanished">Не удалось загрузить файл TDA | Путь: {} | Калибровка включена: {} | Ошибка: {}</translation>
     </message>
     <message>
         <source>Failed to read TDA file.</source>
-        <translation>Не удалось прочитать файл TDA.</translation>
+        <translation type="vanished">Не удалось прочитать файл TDA.</translation>
     </message>
     <message>
         <source>Video(*.asf *.mp4);;All files(*.*)</source>
@@ -133,11 +133,11 @@ Temperature (C): {temp:.0f}</source>
     </message>
     <message>
         <source>Video file load failed | Path: {} | Error: {}</source>
-        <translation>Не удалось загрузить видеофайл | Путь: {} | Ошибка: {}</translation>
+        <translation type="vanished">Не удалось загрузить видеофайл | Путь: {} | Ошибка: {}</translation>
     </message>
     <message>
         <source>Failed to read video file.</source>
-        <translation>Не удалось прочитать видео файл.</translation>
+        <translation type="vanished">Не удалось прочитать видео файл.</translation>
     </message>
     <message>
         <source>Operator: {operator}</source>
@@ -149,11 +149,11 @@ Temperature (C): {temp:.0f}</source>
     </message>
     <message>
         <source>Temperature calibration enabled: {bool}</source>
-        <translation>Калибровка температуры включена: {bool}</translation>
+        <translation type="vanished">Калибровка температуры включена: {bool}</translation>
     </message>
     <message>
         <source>Polynomial coefficients: {coeff}</source>
-        <translation>Коэффициенты полинома: {coeff}</translation>
+        <translation type="vanished">Коэффициенты полинома: {coeff}</translation>
     </message>
 </context>
 <context>
@@ -174,11 +174,11 @@ Temperature (C): {temp:.0f}</source>
     <name>FFmpeg</name>
     <message>
         <source>Video stream not found.</source>
-        <translation>Видео поток не найден.</translation>
+        <translation type="vanished">Видео поток не найден.</translation>
     </message>
     <message>
         <source>Invalid path for the video file: &quot;{path}&quot;</source>
-        <translation>Неверный путь к видеофайлу: &quot;{path}&quot;</translation>
+        <translation type="vanished">Неверный путь к видеофайлу: &quot;{path}&quot;</translation>
     </message>
     <message>
         <source>The file {path} is not a video file or the file does not exist.</source>
@@ -192,6 +192,14 @@ Temperature (C): {temp:.0f}</source>
         <source>The index {i} is not a video stream. It is an {type} stream.</source>
         <translation type="vanished">Индекс {i} не является видеопотоком. Это поток {type}.</translation>
     </message>
+    <message>
+        <source>Joining {n} segments into {path}</source>
+        <translation>Склейка сегментов ({n}) в {path}</translation>
+    </message>
+    <message>
+        <source>Remuxing file: {path}</source>
+        <translation>Перепаковка файла: {path}</translation>
+    </message>
     <message>
         <source>Converting file: {path}</source>
         <translation>Преобразование файла: {path}</translation>
@@ -205,6 +213,13 @@ Temperature (C): {temp:.0f}</source>
         <translation>Преобразование ffmpeg завершено.</translation>
     </message>
 </context>
+<context>
+    <name>GraphPreviewDialog</name>
+    <message>
+        <source>Speed Graph Preview</source>
+        <translation>Предпросмотр графика скорости</translation>
+    </message>
+</context>
 <context>
     <name>MainWindow</name>
     <message>
@@ -227,6 +242,30 @@ Temperature (C): {temp:.0f}</source>
         <source>Crop</source>
         <translation>Кадрирование</translation>
     </message>
+    <message>
+        <source>Options</source>
+        <translation>Параметры</translation>
+    </message>
+    <message>
+        <source>Show Speed Graph</source>
+        <translation>Показывать график скорости</translation>
+    </message>
+    <message>
+        <source>Preview Graph Window</source>
+        <translation>Окно предпросмотра графика</translation>
+    </message>
+    <message>
+        <source>Encoder profile</source>
+        <translation>Профиль кодировщика</translation>
+    </message>
+    <message>
+        <source>Default ({codec})</source>
+        <translation>По умолчанию ({codec})</translation>
+    </message>
+    <message>
+        <source>Rendering preview...</source>
+        <translation>Отрисовка предпросмотра...</translation>
+    </message>
     <message>
         <source>Started video processing</source>
         <translation>Начата обработка видео</translation>
@@ -243,6 +282,18 @@ Temperature (C): {temp:.0f}</source>
         <source>Selected video: {path}</source>
         <translation>Выбранное видео: {path}</translation>
     </message>
+    <message>
+        <source>Warning</source>
+        <translation>Предупреждение</translation>
+    </message>
+    <message>
+        <source>Please load data first.</source>
+        <translation>Сначала загрузите данные.</translation>
+    </message>
+    <message>
+        <source>No speed data available.</source>
+        <translation>Нет данных о скорости.</translation>
+    </message>
     <message>
         <source>VPTAnalizer file(*.tda)</source>
         <translation type="vanished">Файл VPTAnalizer(*.tda)</translation>
@@ -305,7 +356,7 @@ Exception occurred. See log.</source>
     </message>
     <message>
         <source>Temperature calibration y = a3*x^3 + a2*x^2 + a1*x + a0</source>
-        <translation>Температурная калибровка y = a3*x^3 + a2*x^2 + a1*x + a0</translation>
+        <translation type="vanished">Температурная калибровка y = a3*x^3 + a2*x^2 + a1*x + a0</translation>
     </message>
     <message>
         <source>(Experimental) overlay dE/dt plot</source>
@@ -313,11 +364,11 @@ Exception occurred. See log.</source>
     </message>
     <message>
         <source>%v/%m</source>
-        <translation type="unfinished"></translation>
+        <translation>%v/%m</translation>
     </message>
     <message>
         <source>Operator:</source>
-        <translation>Оператор:</translation>
+        <translation type="vanished">Оператор:</translation>
     </message>
     <message>
         <source>Start video processing</source>
@@ -337,7 +388,7 @@ Exception occurred. See log.</source>
     </message>
     <message>
         <source>Sample:</source>
-        <translation>Образец:</translation>
+        <translation type="vanished">Образец:</translation>
     </message>
 </context>
 <context>
@@ -351,27 +402,27 @@ Exception occurred. See log.</source>
     <name>QtCore.QCoreApplication</name>
     <message>
         <source>Video(*.mp4)</source>
-        <translation>Видео(*.mp4)</translation>
+        <translation type="vanished">Видео(*.mp4)</translation>
     </message>
     <message>
         <source>All files(*.*)</source>
-        <translation>Все файлы(*.*)</translation>
+        <translation type="vanished">Все файлы(*.*)</translation>
     </message>
     <message>
         <source>Cleaning {tempdir}</source>
-        <translation>Очистка {tempdir}</translation>
+        <translation type="vanished">Очистка {tempdir}</translation>
     </message>
     <message>
         <source>Config file not found or corrupted. Creating new config file.</source>
-        <translation>Файл конфигурации не найден или поврежден. Создание нового файла конфигурации.</translation>
+        <translation type="vanished">Файл конфигурации не найден или поврежден. Создание нового файла конфигурации.</translation>
     </message>
     <message>
         <source>Config loaded.</source>
-        <translation>Конфигурация загружена.</translation>
+        <translation type="vanished">Конфигурация загружена.</translation>
     </message>
     <message>
         <source>Config updated | Logo Enabled: {} | Text Enabled: {}</source>
-        <translation>Конфигурация обновлена | Логотип включен: {} | Текст включен: {}</translation>
+        <translation type="vanished">Конфигурация обновлена | Логотип включен: {} | Текст включен: {}</translation>
     </message>
     <message>
         <source>t(s): {time:.1f}</source>
@@ -381,6 +432,36 @@ Exception occurred. See log.</source>
         <source>E(mV): {emf:.2f}</source>
         <translation>Е(мВ): {emf:.2f}</translation>
     </message>
+    <message>
+        <source>dT/dt(°C/s): {speed:.2f}</source>
+        <translation>dT/dt(°C/с): {speed:.2f}</translation>
+    </message>
+</context>
+<context>
+    <name>SegmentProcessor</name>
+    <message>
+        <source>Resuming export: {done} of {total} segments are ready</source>
+        <translation>Продолжение экспорта: готово сегментов {done} из {total}</translation>
+    </message>
+    <message>
+        <source>Segment export has finished</source>
+        <translation>Посегментный экспорт завершен</translation>
+    </message>
+    <message>
+        <source>Discarding segments of a different export</source>
+        <translation>Удаление сегментов другого экспорта</translation>
+    </message>
+</context>
+<context>
+    <name>StreamProcessor</name>
+    <message>
+        <source>Streaming export has finished</source>
+        <translation>Потоковый экспорт завершен</translation>
+    </message>
+    <message>
+        <source>No frames were decoded from the video.</source>
+        <translation>Не удалось декодировать ни одного кадра видео.</translation>
+    </message>
 </context>
 <context>
     <name>VideoData</name>
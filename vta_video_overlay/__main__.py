@@ -1,14 +1,18 @@
+import multiprocessing
 import shutil
 import sys
+from pathlib import Path
 
+import click
 from loguru import logger as log
-from PySide6 import QtCore, QtWidgets
+from PySide6 import QtWidgets
 
 import vta_video_overlay.ui.resources_rc  # noqa: F401
 from vta_video_overlay.config import config
 from vta_video_overlay.controller import Controller
 from vta_video_overlay.excepthook import set_excepthook
 from vta_video_overlay.main_window import MainWindow
+from vta_video_overlay.translation import install_translator
 
 
 def close_splash():
@@ -33,10 +37,7 @@ class App(QtWidgets.QApplication):
         return True
 
     def set_language(self):
-        if config.language == "Russian" or config.language == "ru":
-            translator = QtCore.QTranslator(parent=self)
-            translator.load(":/assets/translation_ru.qm")
-            self.installTranslator(translator)
+        install_translator(self)
 
     def run(self):
         if not self.check_environment():
@@ -49,10 +50,72 @@ class App(QtWidgets.QApplication):
         self.exec()
 
 
+def check_profile(ctx, param, value: str | None) -> str | None:
+    if value is not None and value not in config.export.profiles:
+        raise click.BadParameter(
+            f"unknown profile, choose from: {', '.join(config.export.profiles)}"
+        )
+    return value
+
+
+@click.group(invoke_without_command=True)
+@click.option(
+    "--profile",
+    callback=check_profile,
+    help="Encoder profile for this session (see the 'profiles' command).",
+)
+@click.pass_context
+def cli(ctx: click.Context, profile: str | None):
+    """Overlay VTA sensor data onto video. Without a command starts the GUI."""
+    if profile is not None:
+        # Только на этот сеанс: config.update() из интерфейса его не сохранит
+        config.export.session_profile = profile
+    if ctx.invoked_subcommand is None:
+        close_splash()
+        App().run()
+
+
+@cli.command()
+def profiles():
+    """List encoder profiles and their ffmpeg options."""
+    for name, profile in config.export.profiles.items():
+        mark = "*" if name == config.export.active_profile else " "
+        click.echo(f"{mark} {name}: {' '.join(profile.ffmpeg_args())}")
+
+
+@cli.command()
+@click.argument("clip", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--profile",
+    "names",
+    multiple=True,
+    help="Profile to measure (repeatable). All profiles by default.",
+)
+@click.option("--frames", default=300, show_default=True, help="Frames of the clip to encode.")
+def benchmark(clip: Path, names: tuple[str, ...], frames: int):
+    """Measure encode fps and output size of encoder profiles on a sample clip."""
+    from vta_video_overlay.encoder_benchmark import run_benchmark
+
+    for name in names:
+        check_profile(None, None, name)
+    selected = {
+        name: profile
+        for name, profile in config.export.profiles.items()
+        if not names or name in names
+    }
+    click.echo(f"{'profile':<16}{'fps':>10}{'size, KB':>12}{'KB/frame':>10}")
+    for result in run_benchmark(clip, selected, max_frames=frames):
+        click.echo(
+            f"{result.profile:<16}{result.fps:>10.1f}"
+            f"{result.size / 1024:>12.0f}{result.bytes_per_frame / 1024:>10.1f}"
+        )
+
+
 def main():
     """Main entry point for the application."""
-    close_splash()
-    App().run()
+    # Процессы рендеринга в собранном (pyinstaller) приложении
+    multiprocessing.freeze_support()
+    cli()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Альфа-смешивание в целых числах (uint16, alpha 0..255) прямо в ROI кадра.
+Вместо float64-временных массивов на каждый пиксель - один uint16-буфер.
+"""
+
+import numpy as np
+
+
+def clip_rect(
+    shape: tuple[int, ...], x0: int, y0: int, x1: int, y1: int
+) -> tuple[int, int, int, int]:
+    """Обрезает прямоугольник по границам кадра."""
+    h, w = shape[:2]
+    return max(0, x0), max(0, y0), min(w, x1), min(h, y1)
+
+
+def visible_slices(alpha: np.ndarray) -> tuple[slice, slice] | None:
+    """Границы строк и столбцов с ненулевой альфой (None - все прозрачно)."""
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
+
+
+def blend_color(
+    roi: np.ndarray, color: tuple[int, ...], alpha: int | np.ndarray
+):
+    """
+    Заливает ROI цветом с альфой-числом или маской (h, w) uint8.
+    Цвет задается по каналам ROI (BGR или BGRA).
+    """
+    if isinstance(alpha, np.ndarray):
+        alpha = alpha[:, :, None].astype(np.uint16)
+    out = roi * (255 - np.asarray(alpha, np.uint16))
+    out += np.asarray(color, np.uint16) * alpha
+    out += 127
+    out //= 255
+    roi[:] = out
+
+
+def blend_straight(roi: np.ndarray, overlay: np.ndarray):
+    """
+    Накладывает BGRA (обычная альфа) или BGR (непрозрачный) на ROI того же
+    размера. Полностью прозрачные строки и столбцы по краям пропускаются.
+    """
+    if overlay.shape[2] == 3:
+        roi[:] = overlay
+        return
+    visible = visible_slices(overlay[:, :, 3])
+    if visible is None:
+        return
+    roi = roi[visible]
+    overlay = overlay[visible]
+    alpha = overlay[:, :, 3:4].astype(np.uint16)
+    out = overlay[:, :, :3] * alpha
+    out += roi * (255 - alpha)
+    out += 127
+    out //= 255
+    roi[:] = out
+
+
+def blend_premultiplied(roi: np.ndarray, premultiplied: np.ndarray, alpha: np.ndarray):
+    """
+    Накладывает premultiplied-цвет (h, w, 3) uint8 с альфой (h, w, 1) uint16
+    на ROI того же размера.
+    """
+    out = roi * (255 - alpha)
+    out += 127
+    out //= 255
+    out += premultiplied
+    np.minimum(out, 255, out=out)
+    roi[:] = out
@@ -1,5 +1,6 @@
 import configparser
 import locale
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -11,6 +12,8 @@ from loguru import logger as log
 from matplotlib.axes import Axes
 from pydantic import BaseModel, Field, PrivateAttr
 
+from vta_video_overlay.enums import GraphEngine, TextRenderer
+
 # --- КОНСТАНТЫ ЦВЕТОВ И ШРИФТОВ ---
 TEXT_COLOR: Final = (0, 255, 255)
 BG_COLOR: Final = (63, 63, 63)
@@ -20,6 +23,7 @@ TEXT_COLOR_MPL: Final = (TEXT_COLOR[2] / 255, TEXT_COLOR[1] / 255, TEXT_COLOR[0]
 BG_COLOR_MPL: Final = (BG_COLOR[2] / 255, BG_COLOR[1] / 255, BG_COLOR[0] / 255)
 
 FONT_FILENAME: Final = "DejaVuSans.ttf"
+GRAPH_DPI: Final = 100
 
 
 def get_graph_size(frame_width: int, frame_height: int) -> tuple[int, int]:
@@ -65,6 +69,18 @@ class GraphSettings(BaseModel):
     # margin_top удален, так как используется text.margin_y
     speed_smoothing_window: int = 30
     temp_smoothing_window: int = 15
+    # matplotlib - эталонная отрисовка, opencv - быстрая растеризация в numpy
+    engine: GraphEngine = GraphEngine.MATPLOTLIB
+    # Округлять границы осей до делений с гистерезисом: фон перерисовывается реже
+    snap_limits: bool = False
+    # Частота перерисовки графика, Гц (0 - на каждом кадре)
+    update_rate: float = 0.0
+    # Перерисовывать, только когда график сдвинулся на экране хотя бы на пиксель
+    auto_update: bool = False
+    # Рендерить все кадры графика заранее в пуле процессов (хранилище на диске)
+    prerender: bool = False
+    # Лимит размера всех хранилищ заранее отрисованного графика, МБ
+    store_limit_mb: int = 4096
 
 
 class TextSettings(BaseModel):
@@ -75,6 +91,93 @@ class TextSettings(BaseModel):
     margin_y: int = 5
     line_spacing: int = 10
     bg_padding: int = 5
+    # pil - FreeType на каждый кадр, atlas - готовые глифы прямо в BGR-кадр
+    renderer: TextRenderer = TextRenderer.PIL
+
+
+class EncoderProfile(BaseModel):
+    """Параметры кодировщика ffmpeg для итогового видео."""
+    codec: str = "libx264"
+    # None - значение ffmpeg по умолчанию
+    preset: str | None = None
+    # Качество (CRF) или битрейт ("4M"); CRF важнее, если заданы оба
+    crf: int | None = None
+    bitrate: str | None = None
+    pix_fmt: str = "yuv420p"
+    # Потоки кодировщика: 0 - на усмотрение ffmpeg
+    threads: int = 0
+
+    def ffmpeg_args(self) -> list[str]:
+        """Выходные параметры видео для командной строки ffmpeg."""
+        args = ["-c:v", self.codec]
+        if self.preset:
+            args += ["-preset", self.preset]
+        if self.crf is not None:
+            args += ["-crf", str(self.crf)]
+        elif self.bitrate:
+            args += ["-b:v", self.bitrate]
+        args += ["-pix_fmt", self.pix_fmt]
+        if self.threads > 0:
+            args += ["-threads", str(self.threads)]
+        return args
+
+
+def default_encoder_profiles() -> dict[str, EncoderProfile]:
+    return {
+        "fast draft": EncoderProfile(codec="libx264", preset="ultrafast", crf=28),
+        "archive": EncoderProfile(codec="libx264", preset="slow", crf=16),
+        "small": EncoderProfile(codec="libx265", preset="medium", crf=30),
+    }
+
+
+class PreviewSettings(BaseModel):
+    """Настройки предпросмотра."""
+    # Кеш декодированных кадров для перемотки, МБ (0 - выключен)
+    frame_cache_mb: int = 512
+
+
+class ExportSettings(BaseModel):
+    """Настройки экспорта видео."""
+    # Потоковый экспорт: декодирование -> оверлей -> кодирование через pipe ffmpeg
+    streaming: bool = True
+    # Кодек без профиля (параметры ffmpeg по умолчанию)
+    codec: str = "libx264"
+    # Именованные профили кодировщика и выбранный профиль ("" - только codec)
+    profiles: dict[str, EncoderProfile] = Field(default_factory=default_encoder_profiles)
+    profile: str = ""
+    # Профиль только на этот сеанс (--profile в командной строке), в файл не пишется
+    session_profile: str | None = Field(default=None, exclude=True)
+    # Сохранять время кадров исходника (VFR) вместо постоянного fps
+    source_timestamps: bool = True
+    # Масштаб кадра на выходе после кропа (1.0 - исходный размер)
+    output_scale: float = 1.0
+    # Кроп и масштаб в фильтре ffmpeg при декодировании: в Python попадают
+    # только кадры выходного размера (потоковый экспорт в одном процессе)
+    decoder_crop: bool = True
+    # Наложение прямо на кадры yuv420p: в BGR переводятся только области оверлея
+    # (потоковый экспорт в одном процессе, четный размер кадра)
+    native_yuv: bool = False
+    # Число процессов рендеринга: 1 - в текущем процессе, 0 - по числу ядер
+    workers: int = 1
+    # Минимум кадров в одной задаче воркера (задачи растут до буфера рендера
+    # и режутся по ключевым кадрам)
+    chunk_frames: int = 8
+    # Число сегментов для посегментного экспорта (0 - выключен)
+    segments: int = 0
+
+    @property
+    def active_profile(self) -> str:
+        """Профиль текущего сеанса: из командной строки или сохраненный."""
+        return self.profile if self.session_profile is None else self.session_profile
+
+    def encoder(self) -> EncoderProfile:
+        """Выбранный профиль кодировщика."""
+        profile = self.active_profile
+        if profile in self.profiles:
+            return self.profiles[profile]
+        if profile:
+            log.warning(f"Unknown encoder profile {profile!r}, using codec {self.codec}")
+        return EncoderProfile(codec=self.codec)
 
 
 class Config(BaseModel):
@@ -89,6 +192,8 @@ class Config(BaseModel):
     # Группы настроек
     graph: GraphSettings = Field(default_factory=GraphSettings)
     text: TextSettings = Field(default_factory=TextSettings)
+    export: ExportSettings = Field(default_factory=ExportSettings)
+    preview: PreviewSettings = Field(default_factory=PreviewSettings)
 
     # Приватный атрибут для логотипа
     _logo_img: Any = PrivateAttr(default=None)
@@ -113,6 +218,12 @@ class Config(BaseModel):
     def logo_img(self) -> Any:
         return self._logo_img
 
+    def replace_with(self, other: "Config") -> None:
+        """Копирует значения другого конфига в этот объект (для дочерних процессов)."""
+        for name in type(self).model_fields:
+            setattr(self, name, getattr(other, name))
+        self._logo_img = other.logo_img
+
     # --- Методы сериализации ---
     
     def to_json_file(self, path: Path) -> None:
@@ -229,11 +340,16 @@ def style_graph_axes(ax: Axes, label_fontsize: float) -> None:
         spine.set_linewidth(1)
 
 
+def get_graph_font_sizes() -> tuple[float, float]:
+    """Размеры шрифтов графика в пунктах: (title_pt, label_pt)."""
+    title_pt = config.text.additional_size * 72 / GRAPH_DPI
+    label_pt = title_pt * 0.6
+    return title_pt, label_pt
+
+
 def setup_mpl_style() -> tuple[float, float]:
     """Настраивает Matplotlib (полная настройка) и возвращает (title_pt, label_pt)."""
-    dpi = 100
-    title_pt = config.text.additional_size * 72 / dpi
-    label_pt = title_pt * 0.6
+    title_pt, label_pt = get_graph_font_sizes()
     
     setup_mpl_fonts()
     mpl.rcParams['font.size'] = label_pt
@@ -243,7 +359,9 @@ def setup_mpl_style() -> tuple[float, float]:
 
 # --- Инициализация ---
 appdata_path = get_appdata_path()
-setup_logging(appdata_path)
+# Дочерние процессы рендеринга пишут только в stderr, а не в отдельные лог-файлы
+if multiprocessing.parent_process() is None:
+    setup_logging(appdata_path)
 
 CONFIG_PATH = appdata_path / "config.json"
 INI_PATH = appdata_path / "config.ini"
@@ -72,6 +72,8 @@ class Controller(QtCore.QObject):
         if path == "":
             return
         size = FFmpeg().get_resolution(video_path=path)
+        # Полный проход по пакетам нужен только экспорту - считаем его в фоне
+        FFmpeg().prefetch_probe(video_path=path)
         self.pipeline.video_path_input = Path(path)
         return path, size
 
@@ -0,0 +1,221 @@
+import math
+
+import cv2
+import numpy as np
+
+from vta_video_overlay.blending import blend_color, clip_rect
+from vta_video_overlay.config import (
+    BG_ALPHA,
+    BG_COLOR,
+    GRAPH_DPI,
+    TEXT_COLOR,
+    config,
+    get_graph_font_sizes,
+)
+from vta_video_overlay.glyph_atlas import GlyphAtlas, TextMask
+from vta_video_overlay.graph_axes import (
+    GraphLimits,
+    decimate_min_max,
+    nice_ticks,
+    visible_range,
+)
+from vta_video_overlay.graph_overlay import AXES_RECT
+from vta_video_overlay.pil_frame import load_font
+
+# Пунктов matplotlib в пикселе графика
+PX_PER_PT = GRAPH_DPI / 72
+# Непрозрачные цвета элементов (BGRA)
+FG_COLOR = (*TEXT_COLOR, 255)
+MARKER_COLOR = (0, 0, 255, 255)
+# Дробные координаты для cv2 (shift): 1/16 пикселя
+SHIFT = 4
+
+
+def format_tick(value: float, step: float) -> str:
+    """Подпись деления с числом знаков по шагу и типографским минусом."""
+    decimals = max(0, -math.floor(math.log10(step) + 1e-9))
+    if round(step * 10**decimals, 6) % 1:
+        decimals += 1
+    text = f"{value:.{decimals}f}"
+    if float(text) == 0:
+        text = text.lstrip("-")
+    return text.replace("-", "−")
+
+
+class CVGraphOverlay:
+    """
+    График в стиле GraphOverlay, нарисованный напрямую в numpy:
+    сглаженные линии cv2 и подписи из атласа глифов, без matplotlib.
+    Отдает тот же BGRA-кадр, что и get_frame_overlay у GraphOverlay.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        fps: float,
+        width: int,
+        height: int,
+        time_window_sec: float = 30.0,
+    ):
+        self.data = np.nan_to_num(data, nan=0.0, posinf=0.0, neginf=0.0)
+        self.fps = fps
+        self.time_window_sec = time_window_sec
+        self.window_frames = int(time_window_sec * fps)
+        self.width = width
+        self.height = height
+        self.t_full = np.arange(len(data)) / fps
+        self.limits = GraphLimits(
+            data=self.data,
+            fps=fps,
+            time_window_sec=time_window_sec,
+            snap=config.graph.snap_limits,
+        )
+
+        _, label_pt = get_graph_font_sizes()
+        self.label_px = label_pt * PX_PER_PT
+        self.atlas = GlyphAtlas(load_font(round(self.label_px)))
+        self._labels: dict[str, TextMask] = {}
+
+        # Прямоугольник осей в пикселях
+        self.ax0 = round(AXES_RECT["left"] * width)
+        self.ax1 = round(AXES_RECT["right"] * width)
+        self.ay0 = round((1 - AXES_RECT["top"]) * height)
+        self.ay1 = round((1 - AXES_RECT["bottom"]) * height)
+
+        # Размеры по умолчанию matplotlib (в пунктах)
+        self.tick_len = round(3.5 * PX_PER_PT)
+        self.tick_pad = round(3.5 * PX_PER_PT)
+        self.title_pad = round(3 * PX_PER_PT)
+        self.label_pad = round(1 * PX_PER_PT)
+        self.line_thickness = max(1, round(config.graph.line_width * PX_PER_PT))
+        self.marker_radius = config.graph.marker_size * PX_PER_PT / 2
+
+        # Число делений как у AutoLocator: по длине оси и размеру шрифта
+        axis_w_pt = (self.ax1 - self.ax0) / PX_PER_PT
+        axis_h_pt = (self.ay1 - self.ay0) / PX_PER_PT
+        self.nbins_x = max(1, int(axis_w_pt // (label_pt * 3)))
+        self.nbins_y = max(1, int(axis_h_pt // (label_pt * 2)))
+
+        # Рисуем сразу в BGRA поверх полупрозрачного фона: сглаживание cv2
+        # смешивает и альфу, так что непрозрачные элементы ее поднимают
+        self._background = np.empty((height, width, 4), np.uint8)
+        self._background[:] = (*BG_COLOR, round(255 * BG_ALPHA))
+        # Фон с осями и подписями, пока границы не изменились
+        self._axes_image: np.ndarray | None = None
+        self._axes_limits: tuple[tuple[float, float], tuple[float, float]] | None = None
+        self.redraws = 0
+
+    def _text(
+        self, image: np.ndarray, text: str, x: float, y: float, h_align: str, v_align: str
+    ):
+        """
+        Подпись из атласа. h_align: left/center/right относительно x,
+        v_align: top/center/bottom - границы bbox строки относительно y.
+        """
+        line = self._labels.get(text)
+        if line is None:
+            line = self.atlas.text_mask(text)
+            self._labels[text] = line
+        if not line.mask.size:
+            return
+        if h_align == "center":
+            x -= line.width / 2
+        elif h_align == "right":
+            x -= line.width
+        if v_align == "top":
+            baseline = y - line.top
+        elif v_align == "bottom":
+            baseline = y - line.bottom
+        else:
+            baseline = y - (line.top + line.bottom) / 2
+        ox = round(x) + line.x
+        oy = round(baseline) + line.y
+        h, w = line.mask.shape
+        x0, y0, x1, y1 = clip_rect(image.shape, ox, oy, ox + w, oy + h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        mask = line.mask[y0 - oy : y1 - oy, x0 - ox : x1 - ox]
+        blend_color(image[y0:y1, x0:x1], FG_COLOR, mask)
+
+    # --- Кадр графика ---
+
+    def get_frame_overlay(self, current_idx: int) -> np.ndarray:
+        """Рендерит график для текущего кадра."""
+        limits = self.limits.at(current_idx)
+        (x_min, x_max), (y_min, y_max) = limits
+
+        ax0, ax1, ay0, ay1 = self.ax0, self.ax1, self.ay0, self.ay1
+        sx = (ax1 - ax0) / (x_max - x_min)
+        sy = (ay1 - ay0) / (y_max - y_min)
+
+        if self._axes_image is None or limits != self._axes_limits:
+            self.redraws += 1
+            self._axes_image = self._background.copy()
+            self._draw_axes(self._axes_image, x_min, x_max, y_min, y_max, sx, sy)
+            self._axes_limits = limits
+        image = self._axes_image.copy()
+
+        # Линия: только видимая часть, с одной точкой слева для непрерывности
+        start, end = visible_range(current_idx, x_min, self.fps, len(self.data))
+        t, y = decimate_min_max(
+            self.t_full[start:end], self.data[start:end], x_min, x_max, ax1 - ax0
+        )
+        if len(t) >= 2:
+            px = (t - x_min) * sx
+            py = (y_max - y) * sy
+            points = np.round(np.stack([px, py], axis=1) * (1 << SHIFT)).astype(np.int32)
+            # Линия обрезается по осям, как clip у matplotlib
+            cv2.polylines(
+                image[ay0 : ay1 + 1, ax0 : ax1 + 1],
+                [points],
+                False,
+                FG_COLOR,
+                self.line_thickness,
+                cv2.LINE_AA,
+                SHIFT,
+            )
+
+        # Маркер текущей точки (не обрезается осями)
+        if current_idx < len(self.data):
+            mx = ax0 + (current_idx / self.fps - x_min) * sx
+            my = ay0 + (y_max - self.data[current_idx]) * sy
+            center = (round(mx * (1 << SHIFT)), round(my * (1 << SHIFT)))
+            radius = round(self.marker_radius * (1 << SHIFT))
+            cv2.circle(image, center, radius, MARKER_COLOR, -1, cv2.LINE_AA, SHIFT)
+
+        return image
+
+    def _draw_axes(
+        self,
+        image: np.ndarray,
+        x_min: float,
+        x_max: float,
+        y_min: float,
+        y_max: float,
+        sx: float,
+        sy: float,
+    ):
+        ax0, ax1, ay0, ay1 = self.ax0, self.ax1, self.ay0, self.ay1
+
+        # Рамка осей
+        cv2.rectangle(image, (ax0, ay0), (ax1, ay1), FG_COLOR, 1, cv2.LINE_AA)
+
+        # Деления внутрь и подписи
+        x_ticks = nice_ticks(x_min, x_max, self.nbins_x)
+        x_step = x_ticks[1] - x_ticks[0] if len(x_ticks) > 1 else 1.0
+        for value in x_ticks:
+            px = round(ax0 + (value - x_min) * sx)
+            cv2.line(image, (px, ay1), (px, ay1 - self.tick_len), FG_COLOR, 1, cv2.LINE_AA)
+            self._text(image, format_tick(value, x_step), px, ay1 + self.tick_pad, "center", "top")
+
+        y_ticks = nice_ticks(y_min, y_max, self.nbins_y)
+        y_step = y_ticks[1] - y_ticks[0] if len(y_ticks) > 1 else 1.0
+        for value in y_ticks:
+            py = round(ay0 + (y_max - value) * sy)
+            cv2.line(image, (ax0, py), (ax0 + self.tick_len, py), FG_COLOR, 1, cv2.LINE_AA)
+            self._text(image, format_tick(value, y_step), ax0 - self.tick_pad, py, "right", "center")
+
+        # Заголовок и подпись оси X
+        self._text(image, "dT/dt (°C/s)", ax0, ay0 - self.title_pad, "left", "bottom")
+        label_top = ay1 + self.tick_pad + round(self.label_px) + self.label_pad
+        self._text(image, "t(s)", (ax0 + ax1) / 2, label_top, "center", "top")
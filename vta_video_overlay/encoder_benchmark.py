@@ -0,0 +1,78 @@
+import tempfile
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from vta_video_overlay.config import EncoderProfile
+from vta_video_overlay.ffmpeg_pipe import FFmpegDecoder, FFmpegEncoder
+from vta_video_overlay.video_probe import ProbeCache
+
+# Кадров клипа по умолчанию: достаточно для устойчивой оценки скорости
+BENCHMARK_FRAMES = 300
+
+
+@dataclass
+class BenchmarkResult:
+    """Скорость кодирования и размер результата для одного профиля."""
+    profile: str
+    frames: int
+    seconds: float
+    size: int
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_frame(self) -> float:
+        return self.size / self.frames if self.frames else 0.0
+
+
+def load_clip(path: Path, max_frames: int) -> tuple[list[np.ndarray], float]:
+    """Декодирует первые кадры клипа в память, чтобы замерять только кодирование."""
+    probe = ProbeCache.get(path)
+    with FFmpegDecoder(path=path, width=probe.width, height=probe.height) as decoder:
+        frames = list(islice(decoder.frames(), max_frames))
+    return frames, probe.fps or 30.0
+
+
+def benchmark_profile(
+    name: str, profile: EncoderProfile, frames: list[np.ndarray], fps: float, path_output: Path
+) -> BenchmarkResult:
+    height, width = frames[0].shape[:2]
+    start = time.perf_counter()
+    with FFmpegEncoder(
+        path_output=path_output, width=width, height=height, fps=fps, encoder=profile
+    ) as encoder:
+        for image in frames:
+            encoder.write(image)
+    seconds = time.perf_counter() - start
+    return BenchmarkResult(
+        profile=name,
+        frames=len(frames),
+        seconds=seconds,
+        size=path_output.stat().st_size,
+    )
+
+
+def run_benchmark(
+    clip: Path,
+    profiles: dict[str, EncoderProfile],
+    max_frames: int = BENCHMARK_FRAMES,
+) -> list[BenchmarkResult]:
+    """Кодирует один и тот же клип каждым профилем во временные файлы."""
+    frames, fps = load_clip(clip, max_frames)
+    if not frames:
+        raise RuntimeError(f"No frames decoded from {clip}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, profile) in enumerate(profiles.items()):
+            results.append(
+                benchmark_profile(
+                    name, profile, frames, fps, Path(tmp) / f"profile_{i}.mp4"
+                )
+            )
+    return results
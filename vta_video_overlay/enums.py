@@ -7,3 +7,13 @@ class Alignment(Enum):
     BOTTOM_LEFT = auto()
     BOTTOM_RIGHT = auto()
     CENTER = auto()
+
+
+class TextRenderer(str, Enum):
+    PIL = "pil"
+    ATLAS = "atlas"
+
+
+class GraphEngine(str, Enum):
+    MATPLOTLIB = "matplotlib"
+    OPENCV = "opencv"
@@ -0,0 +1,274 @@
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from loguru import logger as log
+
+from vta_video_overlay.config import EncoderProfile
+from vta_video_overlay.matroska_pipe import MatroskaRawWriter
+
+
+def frame_shape(pix_fmt: str, width: int, height: int) -> tuple[int, ...]:
+    """Форма массива сырого кадра: (H, W, 3) для bgr24, (H * 3 / 2, W) для yuv420p."""
+    if pix_fmt == "yuv420p":
+        # Плоскости Y, U, V подряд - раскладка I420, как у cv2
+        return (height * 3 // 2, width)
+    return (height, width, 3)
+
+
+def _read_exact(stream, buf: memoryview) -> bool:
+    """Заполняет буфер целиком. Возвращает False, если поток закончился."""
+    pos = 0
+    while pos < len(buf):
+        n = stream.readinto(buf[pos:])
+        if not n:
+            return False
+        pos += n
+    return True
+
+
+class FFmpegDecoder:
+    """
+    Декодирует видео в поток сырых кадров (bgr24 или yuv420p) через stdout ffmpeg.
+    video_filter (например, кроп и масштаб) применяется до передачи кадров,
+    width и height - размер кадров уже после него.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        width: int,
+        height: int,
+        video_filter: str | None = None,
+        pix_fmt: str = "bgr24",
+    ):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.video_filter = video_filter
+        self.pix_fmt = pix_fmt
+        self.process: subprocess.Popen | None = None
+
+    def build_command(self) -> list[str]:
+        cmd = [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            str(self.path),
+            "-map",
+            "0:v:0",
+        ]
+        if self.video_filter:
+            cmd += ["-vf", self.video_filter]
+        return cmd + [
+            # Один кадр на пакет: индексы кадров совпадают с таймштампами ffprobe
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            self.pix_fmt,
+            "pipe:1",
+        ]
+
+    def start(self) -> "FFmpegDecoder":
+        cmd = self.build_command()
+        log.debug(f"Decoder: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+        )
+        return self
+
+    def __enter__(self) -> "FFmpegDecoder":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """Выдает кадры uint8 формы frame_shape в порядке декодирования."""
+        if self.process is None or self.process.stdout is None:
+            raise RuntimeError("Decoder is not started")
+        shape = frame_shape(self.pix_fmt, self.width, self.height)
+        frame_size = int(np.prod(shape))
+        while True:
+            buf = bytearray(frame_size)
+            if not _read_exact(self.process.stdout, memoryview(buf)):
+                break
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(shape)
+
+    def close(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        if self.process.stdout:
+            self.process.stdout.close()
+        self.process.wait()
+        self.process = None
+
+
+class FFmpegEncoder:
+    """
+    Кодирует сырые кадры (bgr24 или yuv420p) из stdin ffmpeg в итоговый файл.
+    С timestamps (секунды на кадр) кадры идут в Matroska со своим временем,
+    и выход сохраняет время кадров исходника (в том числе VFR),
+    иначе - rawvideo с постоянным fps.
+    """
+
+    def __init__(
+        self,
+        path_output: Path,
+        width: int,
+        height: int,
+        fps: float,
+        encoder: EncoderProfile,
+        audio_source: Path | None = None,
+        timestamps: np.ndarray | None = None,
+        pix_fmt: str = "bgr24",
+    ):
+        self.path_output = path_output
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.encoder = encoder
+        self.audio_source = audio_source
+        self.timestamps = timestamps
+        self.pix_fmt = pix_fmt
+        self.process: subprocess.Popen | None = None
+        self._writer: MatroskaRawWriter | None = None
+        self._frames = 0
+        self._last_ms = -1
+        self._stderr = bytearray()
+        self._stderr_thread: threading.Thread | None = None
+
+    def build_command(self) -> list[str]:
+        cmd = ["ffmpeg", "-v", "error", "-y"]
+        if self.timestamps is not None:
+            # Matroska хранит время от нуля, смещение первого кадра - через itsoffset
+            if len(self.timestamps) and self.timestamps[0] != 0:
+                cmd += ["-itsoffset", f"{self.timestamps[0]:.6f}"]
+            cmd += ["-f", "matroska", "-i", "pipe:0"]
+        else:
+            cmd += [
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                self.pix_fmt,
+                "-s",
+                f"{self.width}x{self.height}",
+                "-r",
+                f"{self.fps}",
+                "-i",
+                "pipe:0",
+            ]
+        if self.audio_source is not None:
+            # Звук берется из исходного файла; "?" - если дорожки нет, это не ошибка
+            cmd += ["-i", str(self.audio_source), "-map", "0:v:0", "-map", "1:a:0?"]
+            cmd += ["-c:a", "aac"]
+        cmd += [
+            # yuv420p требует четных размеров (кроп может дать нечетные)
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            *self.encoder.ffmpeg_args(),
+        ]
+        if self.timestamps is not None:
+            # Время кадров как есть: без дублирования/выбрасывания и пересчета в 1/fps
+            cmd += ["-fps_mode", "passthrough", "-enc_time_base", "-1"]
+        cmd.append(str(self.path_output))
+        return cmd
+
+    def start(self) -> "FFmpegEncoder":
+        cmd = self.build_command()
+        log.debug(f"Encoder: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        # stderr читается в отдельном потоке, чтобы ffmpeg не заблокировался на записи
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(self.process.stderr,), daemon=True
+        )
+        self._stderr_thread.start()
+        if self.timestamps is not None:
+            # stdin=PIPE - поток всегда есть
+            assert self.process.stdin is not None
+            self._writer = MatroskaRawWriter(
+                self.process.stdin, self.width, self.height, self.pix_fmt
+            )
+            self._writer.write_header()
+        return self
+
+    def _drain_stderr(self, stream):
+        for line in stream:
+            self._stderr += line
+
+    def __enter__(self) -> "FFmpegEncoder":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, image: np.ndarray):
+        if self.process is None or self.process.stdin is None:
+            raise RuntimeError("Encoder is not started")
+        try:
+            if self._writer is not None:
+                self._writer.write_frame(image, self._next_pts_ms())
+            else:
+                self.process.stdin.write(np.ascontiguousarray(image).data)
+        except BrokenPipeError:
+            # ffmpeg завершился раньше времени - причина будет в stderr
+            self.close()
+            raise
+
+    def _next_pts_ms(self) -> int:
+        """Время следующего кадра от первого, мс; строго возрастает."""
+        assert self.timestamps is not None
+        idx = self._frames
+        self._frames += 1
+        if idx < len(self.timestamps):
+            t = self.timestamps[idx]
+        else:
+            # Кадров больше, чем таймштампов - продолжаем с номинальным fps
+            last = self.timestamps[-1] if len(self.timestamps) else 0.0
+            t = last + (idx - len(self.timestamps) + 1) / self.fps
+        start = self.timestamps[0] if len(self.timestamps) else 0.0
+        pts_ms = max(round((t - start) * 1000), self._last_ms + 1)
+        self._last_ms = pts_ms
+        return pts_ms
+
+    def close(self):
+        """Завершает запись и дожидается ffmpeg."""
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        if process.stdin:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        process.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+        if process.returncode != 0:
+            raise Exception(self._stderr.decode("utf-8", errors="replace"))
+
+    def abort(self):
+        """Прерывает кодирование без проверки результата."""
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        process.kill()
+        process.wait()
@@ -16,6 +16,8 @@ Core Functionality:
 
 2. Video Processing:
    - Format conversion with progress reporting (convert_video)
+   - Named encoder profiles (codec, preset, CRF/bitrate, pixel format, threads)
+   - Timestamp repair by stream-copy remux (remux_with_genpts)
    - Hardware-accelerated transcoding support
    - Codec-agnostic processing pipeline
 
@@ -27,103 +29,166 @@ Core Functionality:
 Implementation Details:
 - Safe subprocess management with timeout handling
 - JSON-based metadata parsing from ffprobe
+- Single probe per file, cached in memory and on disk (ProbeCache)
 - Automatic timestamp sorting and deduplication
 - Memory-efficient packet processing
 """
 
-import json
 import subprocess
-from decimal import Decimal
 from pathlib import Path
 from typing import List
 
-import ffmpeg
+import numpy as np
 from ffmpeg_progress_yield import FfmpegProgress
 from loguru import logger as log
 from PySide6 import QtCore
 
+from vta_video_overlay.config import EncoderProfile
 from vta_video_overlay.data_collections import ProcessProgress
-
-
-def get_pts(packets: list[dict]) -> List[int]:
-    pts: List[int] = []
-
-    for packet in packets:
-        pts.append(int(Decimal(packet["pts_time"]) * 1000))
-
-    pts.sort()
-    return pts
+from vta_video_overlay.video_probe import (
+    ProbeCache,
+    count_frames,
+    parse_rate,
+    probe_stream_info,
+)
 
 
 class FFmpeg(QtCore.QObject):
     def get_resolution(self, video_path: Path | str) -> tuple[int, int]:
-        probe = ffmpeg.probe(video_path)
-        video_stream = next(
-            (stream for stream in probe["streams"] if stream["codec_type"] == "video"),
-            None,
-        )
-        if video_stream is not None:
-            width = video_stream["width"]
-            height = video_stream["height"]
-            return (width, height)
-        else:
-            raise Exception(self.tr("Video stream not found."))
-
-    def get_timestamps(self, video_path: Path, index: int = 0) -> List[int]:
+        """Reads the container header only, so it is cheap enough for the GUI thread."""
+        info = probe_stream_info(Path(video_path))
+        return (int(info["width"]), int(info["height"]))
+
+    def prefetch_probe(self, video_path: Path | str):
+        """Starts the full (cached) probe in the background, see ProbeCache.prefetch."""
+        ProbeCache.prefetch(video_path)
+
+    def get_timestamps(self, video_path: Path) -> np.ndarray:
         """
         Link: https://ffmpeg.org/ffprobe.html
         My comments:
             Works really well, but the user need to have FFMpeg in his environment variables.
 
+        The file is probed once; repeated calls are served from ProbeCache.
+
         Parameters:
             video (pathlib.Path): Video path
-            index (int): Index of the stream of the video
         Returns:
-            List of timestamps in ms
-            :param index:
+            Sorted int64 array of timestamps in ms
             :param video_path:
         """
+        probe = ProbeCache.get(video_path)
+        if not probe.has_pts:
+            raise KeyError("pts_time")
+        return probe.pts
 
-        # Getting video absolute path and checking for its existance
-        video_path = video_path.resolve()
-        if not video_path.is_file():
-            raise FileNotFoundError(
-                self.tr('Invalid path for the video file: "{path}"').format(
-                    path=video_path
-                )
-            )
-
-        process = subprocess.Popen(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                str(index),
-                "-show_entries",
-                "packet=pts_time",
-                "-of",
-                "json",
-                str(video_path),
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        stdout, stderr = process.communicate()
+    def get_keyframe_indices(self, video_path: Path) -> List[int]:
+        """
+        Returns indices of keyframes in presentation order, i.e. positions
+        in the sorted list returned by get_timestamps.
+        """
+        return ProbeCache.get(video_path).keyframes.tolist()
 
+    def concat_segments(
+        self,
+        segments: list[Path],
+        path_output: Path,
+        audio_source: Path | None = None,
+    ):
+        """Joins segments with the concat demuxer without re-encoding video."""
+        list_path = segments[0].parent / "concat.txt"
+        lines = []
+        for segment in segments:
+            # Escape quotes as required by the concat demuxer
+            escaped = segment.resolve().as_posix().replace("'", "'\\''")
+            lines.append(f"file '{escaped}'\n")
+        list_path.write_text("".join(lines), encoding="utf-8")
+        cmd = [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_path),
+        ]
+        if audio_source is not None:
+            cmd += ["-i", str(audio_source), "-map", "0:v:0", "-map", "1:a:0?"]
+            cmd += ["-c:a", "aac"]
+        cmd += ["-c:v", "copy", str(path_output)]
+        log.info(self.tr("Joining {n} segments into {path}").format(
+            n=len(segments), path=path_output
+        ))
+        try:
+            process = subprocess.run(cmd, capture_output=True)
+        finally:
+            list_path.unlink(missing_ok=True)
         if process.returncode != 0:
-            raise Exception(stderr.decode("utf-8"))
+            raise Exception(process.stderr.decode("utf-8"))
 
-        probe: dict = json.loads(stdout.decode("utf-8"))
+    def remux_with_genpts(self, path_input: Path, path_output: Path) -> bool:
+        """
+        Rewrites the video stream into a new container without re-encoding,
+        regenerating presentation timestamps. Returns False if the remux
+        failed or the result is not a clean timeline (see remux_is_valid).
+        """
+        cmd = ["ffmpeg", "-v", "error", "-y", "-fflags", "+genpts"]
+        try:
+            fps = parse_rate(probe_stream_info(path_input).get("avg_frame_rate"))
+        except Exception as e:
+            log.warning(f"Could not read stream parameters: {e}")
+            return False
+        if fps > 0:
+            # As an input option -r replaces missing timestamps with a constant rate
+            cmd += ["-r", f"{fps:.6g}"]
+        cmd += ["-i", str(path_input), "-map", "0:v:0", "-c", "copy", str(path_output)]
+        log.info(self.tr("Remuxing file: {path}").format(path=path_input))
+        process = subprocess.run(cmd, capture_output=True)
+        if process.returncode != 0:
+            log.warning(f"Remux failed: {process.stderr.decode('utf-8').strip()}")
+            return False
+        try:
+            return self.remux_is_valid(path_output)
+        except Exception as e:
+            log.warning(f"Remuxed file is unreadable: {e}")
+            return False
 
-        return get_pts(probe["packets"])
+    def remux_is_valid(self, video_path: Path) -> bool:
+        """
+        Generated timestamps are only trusted if every packet has one, they
+        start at zero or later, never repeat or go back in presentation order,
+        and every packet decodes to a frame. Streams with B-frames often get
+        negative or duplicate timestamps from genpts, and the decoder then
+        drops frames, so the frame-to-data mapping would be off.
+        """
+        probe = ProbeCache.get(video_path)
+        if not probe.has_pts or not len(probe.pts):
+            log.warning("Remuxed file still has packets without timestamps")
+            return False
+        if probe.pts[0] < 0 or not (np.diff(probe.pts) > 0).all():
+            log.warning("Remuxed file has negative or non-increasing timestamps")
+            return False
+        packets, frames = count_frames(video_path)
+        if packets != frames:
+            log.warning(f"Remuxed file decodes {frames} frames from {packets} packets")
+            return False
+        return True
 
     def convert_video(
         self,
         path_input: Path,
         path_output: Path,
         signal: QtCore.SignalInstance,
+        encoder: EncoderProfile | None = None,
+        keep_timestamps: bool = False,
     ):
+        """
+        Re-encodes the file; without an encoder profile ffmpeg defaults are used.
+        keep_timestamps passes frame timestamps through (VFR stays VFR).
+        """
         cmd = [
             "ffmpeg",
             "-i",
@@ -131,8 +196,12 @@ class FFmpeg(QtCore.QObject):
             "-strict",
             "experimental",
             "-y",  # Overwrite output file if exists
-            str(path_output),
         ]
+        if encoder is not None:
+            cmd += encoder.ffmpeg_args()
+        if keep_timestamps:
+            cmd += ["-fps_mode", "passthrough"]
+        cmd.append(str(path_output))
         ff = FfmpegProgress(cmd)
         log.info(self.tr("Converting file: {path}").format(path=path_input))
         log.info(self.tr("Saving to: {path}").format(path=path_output))
@@ -141,8 +210,12 @@ class FFmpeg(QtCore.QObject):
         log.info(self.tr("ffmpeg conversion finished."))
 
     def check_for_packets(self, video_path: Path) -> bool:
-        try:
-            self.get_timestamps(video_path)
-            return True
-        except KeyError:
-            return False
+        """Quick check on sampled packets; the full scan runs only when needed."""
+        return ProbeCache.has_timestamps(video_path)
+
+    def check_all_packets(self, video_path: Path) -> bool:
+        """
+        Full scan: every packet has a timestamp. The scan is cached and is
+        reused by get_timestamps, so it costs nothing extra before VideoData.
+        """
+        return ProbeCache.get(video_path).has_pts
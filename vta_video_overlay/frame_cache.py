@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FrameCache:
+    """
+    LRU-кеш декодированных кадров с лимитом по памяти.
+    Перемотка предпросмотра туда-обратно по одному участку берет кадры
+    отсюда вместо повторного декодирования от ключевого кадра.
+    """
+
+    def __init__(self, limit_mb: int):
+        self.limit_bytes = limit_mb * 2**20
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[int, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._frames
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, index: int) -> np.ndarray | None:
+        """Кадр из кеша (не изменять на месте) или None."""
+        img = self._frames.get(index)
+        if img is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._frames.move_to_end(index)
+        return img
+
+    def put(self, index: int, img: np.ndarray):
+        """Сохраняет кадр, вытесняя давно не использованные."""
+        if img.nbytes > self.limit_bytes:
+            return
+        old = self._frames.pop(index, None)
+        if old is not None:
+            self.used_bytes -= old.nbytes
+        self._frames[index] = img
+        self.used_bytes += img.nbytes
+        while self.used_bytes > self.limit_bytes:
+            _, evicted = self._frames.popitem(last=False)
+            self.used_bytes -= evicted.nbytes
+
+    def clear(self):
+        self._frames.clear()
+        self.used_bytes = 0
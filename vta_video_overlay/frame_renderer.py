@@ -1,13 +1,103 @@
 
+from typing import Callable, NamedTuple
+
 import numpy as np
 
 from vta_video_overlay.config import config, get_graph_size
 from vta_video_overlay.data_file import Data
-from vta_video_overlay.graph_overlay import GraphOverlay
+from vta_video_overlay.graph_store import (
+    GraphStore,
+    create_graph_overlay,
+    graph_store_key,
+)
+from vta_video_overlay.graph_update import GraphUpdateLimiter
 from vta_video_overlay.aligned_data import AlignedData
 from vta_video_overlay.video_context import VideoContext
-from vta_video_overlay.opencv_frame import CVFrame
-from vta_video_overlay.make_frame import make_frame
+from vta_video_overlay.opencv_frame import CVFrame, Size, clamp_crop
+from vta_video_overlay.make_frame import draw_static_overlay, make_frame
+from vta_video_overlay.static_layer import StaticLayer
+from vta_video_overlay.text_cache import TextTileCache
+
+
+class RenderAborted(Exception):
+    """Рендер кадра прерван: результат больше не нужен."""
+
+
+class FrameGeometry(NamedTuple):
+    """Кроп исходного кадра и размер кадра на выходе (после кропа и масштаба)."""
+    crop: tuple[int, int, int, int] | None  # x, y, w, h
+    width: int
+    height: int
+    scaled: bool
+
+    @classmethod
+    def create(cls, width: int, height: int, crop_rect=None) -> "FrameGeometry":
+        crop = None
+        if crop_rect is not None:
+            crop = clamp_crop(crop_rect, width, height)
+            width, height = crop[2], crop[3]
+        scale = config.export.output_scale
+        scaled = scale > 0 and scale != 1.0
+        if scaled:
+            # Четные размеры: их требуют yuv420p-кодировщики
+            width = max(2, round(width * scale / 2) * 2)
+            height = max(2, round(height * scale / 2) * 2)
+        return cls(crop=crop, width=width, height=height, scaled=scaled)
+
+    def ffmpeg_filter(self) -> str | None:
+        """Фильтр ffmpeg, выдающий кадры этой геометрии (None - не нужен)."""
+        filters = []
+        if self.crop is not None:
+            x, y, w, h = self.crop
+            if x % 2 or y % 2:
+                # Нечетный сдвиг в yuv420p смещает цветность - кроп уже в BGR
+                filters.append("format=bgr24")
+            filters.append(f"crop={w}:{h}:{x}:{y}:exact=1")
+        if self.scaled:
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        return ",".join(filters) or None
+
+    def apply(self, frame: CVFrame):
+        """Кроп и масштаб уже декодированного кадра."""
+        if self.crop is not None:
+            frame.crop(*self.crop)
+        if self.scaled:
+            frame.resize(self.width, self.height)
+
+
+def get_frame_graph_size(video_ctx: VideoContext, crop_rect=None) -> tuple[int, int]:
+    """Размер графика для кадра после кропа и масштаба."""
+    geometry = FrameGeometry.create(video_ctx.width, video_ctx.height, crop_rect)
+    return get_graph_size(geometry.width, geometry.height)
+
+
+def prerender_graph(
+    video_ctx: VideoContext,
+    aligned: AlignedData,
+    crop_rect=None,
+    graph_enabled: bool = True,
+    workers: int = 1,
+):
+    """
+    Стадия экспорта перед рендерингом кадров: заполняет хранилище графика,
+    которое затем открывают FrameRenderer'ы (в том числе в воркерах).
+    """
+    if not (
+        config.graph.prerender
+        and config.graph.enabled
+        and graph_enabled
+        and aligned.speed is not None
+    ):
+        return
+    g_w, g_h = get_frame_graph_size(video_ctx, crop_rect)
+    GraphStore.build(
+        data=aligned.speed,
+        fps=video_ctx.fps,
+        width=g_w,
+        height=g_h,
+        time_window_sec=config.graph.time_window,
+        workers=workers,
+    )
 
 
 class FrameRenderer:
@@ -20,10 +110,22 @@ class FrameRenderer:
         timestamps: np.ndarray | None = None,  # None = linspace для preview
         crop_rect=None,
         graph_enabled: bool = True,
+        decoder_crop: bool = False,  # кадры приходят уже обрезанными декодером
     ):
         self.video_ctx = video_ctx
         self.data = data
         self.crop_rect = crop_rect
+        self.geometry = FrameGeometry.create(video_ctx.width, video_ctx.height, crop_rect)
+        self.decoder_crop = decoder_crop
+        self._static_layer: StaticLayer | None = None
+        self._static_key: tuple | None = None
+        # Ключ настроек текста для кеша тайлов и статического слоя. Считается
+        # один раз: за время жизни рендерера настройки текста не меняются
+        # (воркеры получают конфиг до создания рендерера)
+        self.text_style = config.text.model_dump_json()
+        # Строки данных меняются реже кадров - тайлы переиспользуются
+        self.text_cache = TextTileCache()
+        self.text_cache.set_style(self.text_style)
         
         # Временная сетка
         if timestamps is None:
@@ -34,41 +136,121 @@ class FrameRenderer:
         self.aligned = AlignedData.from_data(timestamps, data)
         
         # График
-        self.graph_renderer = None
+        self.graph_renderer: GraphStore | GraphUpdateLimiter | None = None
         if graph_enabled and self.aligned.speed is not None:
-            frame_w = crop_rect.w if crop_rect else video_ctx.width
-            frame_h = crop_rect.h if crop_rect else video_ctx.height
-            g_w, g_h = get_graph_size(frame_w, frame_h)
-            
-            self.graph_renderer = GraphOverlay(
-                data=self.aligned.speed,
-                fps=video_ctx.fps,
-                width=g_w,
-                height=g_h,
-                time_window_sec=config.graph.time_window,
-            )
+            g_w, g_h = get_graph_size(self.geometry.width, self.geometry.height)
+            # Готовые тайлы, если график уже отрисован заранее
+            if config.graph.prerender:
+                self.graph_renderer = GraphStore.open(
+                    graph_store_key(
+                        data=self.aligned.speed,
+                        fps=video_ctx.fps,
+                        width=g_w,
+                        height=g_h,
+                        time_window_sec=config.graph.time_window,
+                    )
+                )
+            if self.graph_renderer is None:
+                self.graph_renderer = create_graph_overlay(
+                    data=self.aligned.speed,
+                    fps=video_ctx.fps,
+                    width=g_w,
+                    height=g_h,
+                    time_window_sec=config.graph.time_window,
+                )
     
-    def render_frame(self, frame_index: int) -> CVFrame | None:
-        """Рендерит один кадр."""
+    def render_frame(
+        self, frame_index: int, abort: Callable[[], bool] | None = None
+    ) -> CVFrame | None:
+        """
+        Рендерит один кадр. Если abort() стал True между стадиями
+        (декодирование, график, текст), бросает RenderAborted.
+        """
         img = self.video_ctx.read_frame(frame_index)
         if img is None:
             return None
-        
+        if abort is not None and abort():
+            raise RenderAborted
+        return self.render_image(img, frame_index, abort=abort)
+
+    def render_image(
+        self,
+        img: np.ndarray,
+        frame_index: int,
+        touched: list | None = None,
+        abort: Callable[[], bool] | None = None,
+    ) -> CVFrame:
+        """
+        Накладывает оверлей на уже декодированный кадр.
+        В touched собираются области, в которых менялись пиксели.
+        """
         emf, temp, speed = self.aligned.at_index(frame_index)
         
         graph_img = None
         if self.graph_renderer and config.graph.enabled:
             graph_img = self.graph_renderer.get_frame_overlay(frame_index)
+        if abort is not None and abort():
+            raise RenderAborted
         
+        # Кроп заранее: по размеру кадра после кропа строится статический слой
+        cvframe = CVFrame(image=img)
+        if not self.decoder_crop:
+            self.geometry.apply(cvframe)
+        
+        operator_name = f"Operator: {self.data.operator}"
+        sample_name = f"Sample: {self.data.sample}"
+        add_text = config.additional_text if config.additional_text_enabled else None
         return make_frame(
-            img=img,
-            crop_rect=self.crop_rect,
+            img=cvframe.image,
+            crop_rect=None,
             time=float(self.aligned.timestamps[frame_index]),
             emf=emf,
             temp=temp,
             temp_speed=speed,
             graph_img=graph_img,
-            operator_name=f"Operator: {self.data.operator}",
-            sample_name=f"Sample: {self.data.sample}",
-            add_text=config.additional_text if config.additional_text_enabled else None,
+            operator_name=operator_name,
+            sample_name=sample_name,
+            add_text=add_text,
+            static_layer=self.get_static_layer(
+                size=cvframe.size,
+                operator_name=operator_name,
+                sample_name=sample_name,
+                add_text=add_text,
+                text_style=self.text_style,
+            ),
+            text_cache=self.text_cache,
+            touched=touched,
         )
+    
+    def get_static_layer(
+        self,
+        size: Size,
+        operator_name: str,
+        sample_name: str,
+        add_text: str | None,
+        text_style: str,
+    ) -> StaticLayer:
+        """
+        Слой с логотипом и нижними подписями. Пересобирается только при
+        изменении размера кадра, подписей или настроек текста.
+        """
+        key = (
+            size,
+            operator_name,
+            sample_name,
+            add_text,
+            config.logo_enabled,
+            text_style,
+        )
+        if self._static_layer is None or key != self._static_key:
+            self._static_layer = StaticLayer.from_drawing(
+                size=size,
+                draw=lambda frame: draw_static_overlay(
+                    frame,
+                    operator_name=operator_name,
+                    sample_name=sample_name,
+                    add_text=add_text,
+                ),
+            )
+            self._static_key = key
+        return self._static_layer
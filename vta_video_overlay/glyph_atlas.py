@@ -0,0 +1,197 @@
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from vta_video_overlay.blending import blend_color, clip_rect
+from vta_video_overlay.config import BG_ALPHA, BG_COLOR, TEXT_COLOR, config
+from vta_video_overlay.enums import Alignment
+from vta_video_overlay.pil_frame import PILFONT, PILFONTSMALL, FontType
+
+# Запас вокруг глифа: у некоторых символов чернила выходят за bbox
+GLYPH_PAD = 2
+
+
+class Glyph(NamedTuple):
+    mask: np.ndarray  # (h, w) uint8, альфа глифа
+    x: int  # смещение маски относительно начала глифа на базовой линии
+    y: int
+    top: int  # вертикальные границы bbox глифа относительно базовой линии
+    bottom: int
+    advance: float
+
+
+class TextMask(NamedTuple):
+    mask: np.ndarray  # (h, w) uint8, альфа всей строки
+    x: int  # смещение маски относительно начала строки на базовой линии
+    y: int
+    width: float
+    top: int  # вертикальные границы bbox строки относительно базовой линии
+    bottom: int
+
+
+class GlyphAtlas:
+    """
+    Атлас глифов одного шрифта: каждый символ растеризуется FreeType один раз,
+    дальше строки собираются из готовых альфа-масок с учетом кернинга.
+    """
+
+    def __init__(self, font: FontType):
+        self.font = font
+        self._glyphs: dict[str, Glyph] = {}
+        self._kerning: dict[tuple[str, str], float] = {}
+
+    def glyph(self, char: str) -> Glyph:
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self._rasterize(char)
+            self._glyphs[char] = glyph
+        return glyph
+
+    def _rasterize(self, char: str) -> Glyph:
+        x0, y0, x1, y1 = (int(v) for v in self.font.getbbox(char, anchor="ls"))
+        advance = float(self.font.getlength(char))
+        if x1 <= x0 or y1 <= y0:
+            # Пробел и прочие символы без чернил
+            return Glyph(np.zeros((0, 0), np.uint8), 0, 0, 0, 0, advance)
+        w = x1 - x0 + 2 * GLYPH_PAD
+        h = y1 - y0 + 2 * GLYPH_PAD
+        img = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(img).text(
+            (GLYPH_PAD - x0, GLYPH_PAD - y0), char, font=self.font, fill=255, anchor="ls"
+        )
+        return Glyph(
+            mask=np.asarray(img),
+            x=x0 - GLYPH_PAD,
+            y=y0 - GLYPH_PAD,
+            top=y0,
+            bottom=y1,
+            advance=advance,
+        )
+
+    def kerning(self, left: str, right: str) -> float:
+        pair = (left, right)
+        value = self._kerning.get(pair)
+        if value is None:
+            value = float(
+                self.font.getlength(left + right)
+                - self.font.getlength(left)
+                - self.font.getlength(right)
+            )
+            self._kerning[pair] = value
+        return value
+
+    def layout(self, text: str) -> tuple[list[tuple[Glyph, int]], float, int, int]:
+        """Возвращает (глифы с позициями x, ширина, верх, низ относительно базовой линии)."""
+        placed: list[tuple[Glyph, int]] = []
+        pen = 0.0
+        prev = None
+        for char in text:
+            if prev is not None:
+                pen += self.kerning(prev, char)
+            glyph = self.glyph(char)
+            placed.append((glyph, round(pen)))
+            pen += glyph.advance
+            prev = char
+        inked = [glyph for glyph, _ in placed if glyph.mask.size]
+        top = min((glyph.top for glyph in inked), default=0)
+        bottom = max((glyph.bottom for glyph in inked), default=0)
+        return placed, pen, top, bottom
+
+    def put_text(
+        self,
+        image: np.ndarray,
+        text: str,
+        xy: tuple[int, int],
+        align: Alignment,
+        color: tuple[int, int, int] = TEXT_COLOR,
+        bg_color: tuple[int, int, int] | None = BG_COLOR,
+    ) -> tuple[int, int, int, int]:
+        """
+        Рисует строку прямо в BGR-кадр. Геометрия совпадает с PILFrame.put_text:
+        возвращается расширенный (с отступом фона) bbox.
+        """
+        line = self.text_mask(text)
+
+        x, y = xy
+        if align in (Alignment.TOP_RIGHT, Alignment.BOTTOM_RIGHT):
+            x -= round(line.width)
+        # Как в PIL: "t" - верх bbox строки, "b" - низ
+        if align in (Alignment.TOP_LEFT, Alignment.TOP_RIGHT):
+            baseline = y - line.top
+        else:
+            baseline = y - line.bottom
+        bbox = (x, baseline + line.top, x + int(np.ceil(line.width)), baseline + line.bottom)
+
+        pad = config.text.bg_padding
+        expanded_bbox = (bbox[0] - pad, bbox[1] - pad, bbox[2] + pad, bbox[3] + pad)
+
+        if bg_color is not None:
+            _blend_rect(image, expanded_bbox, bg_color[::-1], int(255 * BG_ALPHA))
+        if line.mask.size:
+            _blend_mask(image, line.mask, (x + line.x, baseline + line.y), color)
+        return expanded_bbox
+
+    def text_mask(self, text: str) -> TextMask:
+        """Собирает маску всей строки из глифов (для одного смешивания)."""
+        placed, width, top, bottom = self.layout(text)
+        mx0 = min((gx + g.x for g, gx in placed if g.mask.size), default=0)
+        my0 = top - GLYPH_PAD
+        mx1 = max((gx + g.x + g.mask.shape[1] for g, gx in placed if g.mask.size), default=0)
+        my1 = bottom + GLYPH_PAD
+        if mx1 <= mx0 or my1 <= my0:
+            return TextMask(np.zeros((0, 0), np.uint8), 0, 0, width, top, bottom)
+        mask = np.zeros((my1 - my0, mx1 - mx0), np.uint8)
+        for glyph, gx in placed:
+            if not glyph.mask.size:
+                continue
+            ox = gx + glyph.x - mx0
+            oy = glyph.y - my0
+            h, w = glyph.mask.shape
+            region = mask[oy : oy + h, ox : ox + w]
+            np.maximum(region, glyph.mask, out=region)
+        return TextMask(mask, mx0, my0, width, top, bottom)
+
+
+def _blend_rect(
+    image: np.ndarray,
+    rect: tuple[int, int, int, int],
+    color: tuple[int, int, int],
+    alpha: int,
+):
+    """
+    Полупрозрачный прямоугольник (alpha 0..255) только в своей области кадра.
+    Как у ImageDraw.rectangle, правая и нижняя границы входят в прямоугольник.
+    """
+    x0, y0, x1, y1 = clip_rect(image.shape, rect[0], rect[1], rect[2] + 1, rect[3] + 1)
+    if x1 <= x0 or y1 <= y0:
+        return
+    blend_color(image[y0:y1, x0:x1], color, alpha)
+
+
+def _blend_mask(
+    image: np.ndarray,
+    mask: np.ndarray,
+    origin: tuple[int, int],
+    color: tuple[int, int, int],
+):
+    """Заливает цветом по альфа-маске, начиная с точки origin (x, y)."""
+    ox, oy = origin
+    x0, y0, x1, y1 = clip_rect(
+        image.shape, ox, oy, ox + mask.shape[1], oy + mask.shape[0]
+    )
+    if x1 <= x0 or y1 <= y0:
+        return
+    blend_color(image[y0:y1, x0:x1], color, mask[y0 - oy : y1 - oy, x0 - ox : x1 - ox])
+
+
+_ATLASES: dict[bool, GlyphAtlas] = {}
+
+
+def get_atlas(small: bool = False) -> GlyphAtlas:
+    """Атлас для PILFONT/PILFONTSMALL (создается при первом обращении)."""
+    atlas = _ATLASES.get(small)
+    if atlas is None:
+        atlas = GlyphAtlas(PILFONTSMALL if small else PILFONT)
+        _ATLASES[small] = atlas
+    return atlas
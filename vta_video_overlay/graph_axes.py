@@ -0,0 +1,185 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# Шаги делений как у MaxNLocator
+TICK_STEPS = (1.0, 2.0, 2.5, 5.0, 10.0)
+# Запас по Y от минимума/максимума окна
+Y_MARGIN = 0.1
+# Снапнутые границы сужаются, когда данные занимают меньше этой доли диапазона
+SHRINK_RATIO = 0.5
+# Шаг снапа по X - «красивая» доля окна
+X_SNAP_DIVISIONS = 10
+# Ориентировочное число делений по Y для шага снапа
+Y_SNAP_BINS = 5
+
+
+def nice_step(raw_step: float) -> float:
+    """Наименьший «красивый» шаг (1, 2, 2.5, 5 * 10^k) не меньше raw_step."""
+    scale = 10 ** math.floor(math.log10(raw_step))
+    return next(s * scale for s in TICK_STEPS if s * scale >= raw_step * (1 - 1e-9))
+
+
+def nice_ticks(vmin: float, vmax: float, nbins: int) -> list[float]:
+    """
+    Деления с «красивым» шагом внутри [vmin, vmax] (упрощенный MaxNLocator):
+    наименьший шаг не меньше span / nbins, но так, чтобы делений было хотя бы два.
+    """
+    span = vmax - vmin
+    if span <= 0:
+        return [vmin]
+    raw_step = span / max(1, nbins)
+    scale = 10 ** math.floor(math.log10(raw_step))
+    steps = [s * scale for s in (0.5, *TICK_STEPS)]
+    large = [s for s in steps if s >= raw_step * (1 - 1e-9)]
+    candidates = reversed(steps[: steps.index(large[0]) + 1])
+    ticks: list[float] = []
+    for step in candidates:
+        first = math.ceil(vmin / step - 1e-9)
+        last = math.floor(vmax / step + 1e-9)
+        ticks = [i * step for i in range(first, last + 1)]
+        if len(ticks) >= 2:
+            break
+    return ticks
+
+
+def sliding_min_max(data: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Минимум и максимум data[max(0, i - window) : i + 1] для каждого i
+    за один проход (монотонные очереди, O(1) на элемент).
+    """
+    n = len(data)
+    mins = np.empty(n, dtype=np.float64)
+    maxs = np.empty(n, dtype=np.float64)
+    # В очередях индексы; значения по ним монотонны
+    min_q: deque[int] = deque()
+    max_q: deque[int] = deque()
+    values = data.tolist()
+    for i, value in enumerate(values):
+        while min_q and values[min_q[-1]] >= value:
+            min_q.pop()
+        min_q.append(i)
+        while max_q and values[max_q[-1]] <= value:
+            max_q.pop()
+        max_q.append(i)
+        # Выкидываем индексы, вышедшие из окна
+        if min_q[0] < i - window:
+            min_q.popleft()
+        if max_q[0] < i - window:
+            max_q.popleft()
+        mins[i] = values[min_q[0]]
+        maxs[i] = values[max_q[0]]
+    return mins, maxs
+
+
+class GraphLimits:
+    """
+    Границы осей графика для каждого кадра, посчитанные заранее за один проход.
+    С snap=True границы округляются до «красивых» шагов с гистерезисом:
+    они меняются, только когда данные выходят за текущий диапазон
+    (или занимают слишком малую его часть), поэтому фон осей
+    перерисовывается редко.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        fps: float,
+        time_window_sec: float,
+        snap: bool = False,
+    ):
+        self.fps = fps
+        self.time_window_sec = time_window_sec
+        self.window_frames = int(time_window_sec * fps)
+        self.snap = snap
+
+        mins, maxs = sliding_min_max(data, self.window_frames)
+        margin = (maxs - mins) * Y_MARGIN
+        margin[margin == 0] = 1.0
+        self.y_min = mins - margin
+        self.y_max = maxs + margin
+        if snap:
+            self._snap_y()
+            self.x_step = nice_step(time_window_sec / X_SNAP_DIVISIONS)
+
+    def _snap_y(self):
+        """Последовательно (из-за гистерезиса) округляет границы Y."""
+        snapped_min = np.empty_like(self.y_min)
+        snapped_max = np.empty_like(self.y_max)
+        lo_cur = hi_cur = None
+        for i, (lo, hi) in enumerate(zip(self.y_min.tolist(), self.y_max.tolist())):
+            keep = (
+                lo_cur is not None
+                and lo_cur <= lo
+                and hi <= hi_cur
+                and (hi - lo) >= SHRINK_RATIO * (hi_cur - lo_cur)
+            )
+            if not keep:
+                step = nice_step((hi - lo) / Y_SNAP_BINS)
+                lo_cur = math.floor(lo / step) * step
+                hi_cur = math.ceil(hi / step) * step
+            snapped_min[i] = lo_cur
+            snapped_max[i] = hi_cur
+        self.y_min = snapped_min
+        self.y_max = snapped_max
+
+    def __len__(self) -> int:
+        return len(self.y_min)
+
+    def xlim(self, current_idx: int) -> tuple[float, float]:
+        current_time = current_idx / self.fps
+        if self.snap:
+            # Правая граница - следующая отметка шага, окно сдвигается скачками
+            x_max = max(math.ceil(current_time / self.x_step - 1e-9), 1) * self.x_step
+            if x_max <= self.time_window_sec:
+                return 0.0, x_max
+            return x_max - self.time_window_sec, x_max
+        if current_time <= self.time_window_sec:
+            return 0.0, max(current_time, 0.1)
+        return current_time - self.time_window_sec, current_time
+
+    def ylim(self, current_idx: int) -> tuple[float, float]:
+        if not len(self.y_min):
+            return -1.0, 1.0
+        i = min(current_idx, len(self.y_min) - 1)
+        return float(self.y_min[i]), float(self.y_max[i])
+
+    def at(self, current_idx: int) -> tuple[tuple[float, float], tuple[float, float]]:
+        """Границы (xlim, ylim) для кадра."""
+        return self.xlim(current_idx), self.ylim(current_idx)
+
+
+def visible_range(current_idx: int, x_min: float, fps: float, total: int) -> tuple[int, int]:
+    """Индексы точек линии в окне [x_min, текущий кадр] плюс одна точка слева."""
+    start = max(0, math.floor(x_min * fps) - 1)
+    end = min(current_idx + 1, total)
+    return start, max(start, end)
+
+
+def decimate_min_max(
+    t: np.ndarray, y: np.ndarray, x_min: float, x_max: float, columns: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Прореживание линии по столбцам пикселей: в каждом столбце остаются только
+    точки минимума и максимума (в исходном порядке), не больше 2 * columns точек.
+    Форма линии на экране при этом не меняется.
+    """
+    if len(t) <= 2 * columns or x_max <= x_min:
+        return t, y
+    col = ((t - x_min) * (columns / (x_max - x_min))).astype(np.int64)
+    # t отсортировано, поэтому точки одного столбца идут подряд
+    starts = np.flatnonzero(np.r_[True, col[1:] != col[:-1]])
+    counts = np.diff(np.r_[starts, len(t)])
+    group = np.repeat(np.arange(len(starts)), counts)
+    # Первые индексы минимума и максимума в каждой группе
+    is_min = y == np.repeat(np.minimum.reduceat(y, starts), counts)
+    is_max = y == np.repeat(np.maximum.reduceat(y, starts), counts)
+    min_pos = np.flatnonzero(is_min)
+    max_pos = np.flatnonzero(is_max)
+    _, first_min = np.unique(group[min_pos], return_index=True)
+    _, first_max = np.unique(group[max_pos], return_index=True)
+    keep = np.union1d(min_pos[first_min], max_pos[first_max])
+    # Последняя точка (текущий кадр) нужна всегда
+    keep = np.union1d(keep, [len(t) - 1])
+    return t[keep], y[keep]
@@ -3,9 +3,13 @@ from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 
 from vta_video_overlay.config import (
-    BG_COLOR_MPL, TEXT_COLOR, BG_ALPHA, 
+    BG_COLOR_MPL, TEXT_COLOR, BG_ALPHA, GRAPH_DPI,
     config, setup_mpl_style, style_graph_axes
 )
+from vta_video_overlay.graph_axes import GraphLimits, decimate_min_max, visible_range
+
+# Положение осей в долях размера графика (как subplots_adjust)
+AXES_RECT = dict(left=0.18, right=0.95, top=0.90, bottom=0.12)
 
 
 class GraphOverlay:
@@ -26,9 +30,18 @@ class GraphOverlay:
         
         # Полная временная ось
         self.t_full = np.arange(len(data)) / fps
+        # Границы осей для всех кадров сразу
+        self.limits = GraphLimits(
+            data=self.data,
+            fps=fps,
+            time_window_sec=time_window_sec,
+            snap=config.graph.snap_limits,
+        )
+        # Ширина области осей в пикселях - предел детализации линии
+        self.columns = max(1, round((AXES_RECT["right"] - AXES_RECT["left"]) * width))
         
         # --- НАСТРОЙКА MATPLOTLIB ---
-        self.dpi = 100
+        self.dpi = GRAPH_DPI
         title_pt, label_pt = setup_mpl_style()
         
         self.fig = Figure(
@@ -80,7 +93,7 @@ class GraphOverlay:
             animated=True
         )
         
-        self.fig.subplots_adjust(left=0.18, right=0.95, top=0.90, bottom=0.12)
+        self.fig.subplots_adjust(**AXES_RECT)
         
         self.canvas = FigureCanvasAgg(self.fig)
         
@@ -88,41 +101,19 @@ class GraphOverlay:
         self._background = None
         self._last_xlim = None
         self._last_ylim = None
+        # Число полных перерисовок фона (для статистики экспорта)
+        self.redraws = 0
 
     def _update_background(self):
         """Сохраняет статичный фон для blitting."""
+        self.redraws += 1
         self.canvas.draw()
         self._background = self.canvas.copy_from_bbox(self.ax.bbox)
 
     def get_frame_overlay(self, current_idx: int) -> np.ndarray:
         """Рендерит график для текущего кадра."""
         current_time = current_idx / self.fps
-        
-        # Расчет границ X
-        if current_time <= self.time_window_sec:
-            x_min = 0.0
-            x_max = max(current_time, 0.1)
-        else:
-            x_min = current_time - self.time_window_sec
-            x_max = current_time
-        
-        # Расчет границ Y
-        start_idx = max(0, current_idx - self.window_frames)
-        end_idx = current_idx + 1
-        visible_data = self.data[start_idx:end_idx]
-        
-        if len(visible_data) > 0:
-            y_min, y_max = float(visible_data.min()), float(visible_data.max())
-            margin = (y_max - y_min) * 0.1
-            if margin == 0:
-                margin = 1.0
-            y_min -= margin
-            y_max += margin
-        else:
-            y_min, y_max = -1.0, 1.0
-        
-        new_xlim = (x_min, x_max)
-        new_ylim = (y_min, y_max)
+        new_xlim, new_ylim = self.limits.at(current_idx)
         
         # Проверяем, изменились ли лимиты
         limits_changed = (
@@ -141,9 +132,12 @@ class GraphOverlay:
         # Восстанавливаем фон
         self.canvas.restore_region(self._background)
         
-        # Обновляем данные линии
-        t_slice = self.t_full[:end_idx]
-        data_slice = self.data[:end_idx]
+        # Только видимое окно, прореженное до ~2 точек на столбец пикселей:
+        # стоимость кадра не зависит от позиции в видео
+        start, end = visible_range(current_idx, new_xlim[0], self.fps, len(self.data))
+        t_slice, data_slice = decimate_min_max(
+            self.t_full[start:end], self.data[start:end], *new_xlim, self.columns
+        )
         self.line.set_data(t_slice, data_slice)
         
         # Обновляем маркер
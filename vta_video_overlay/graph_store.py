@@ -0,0 +1,284 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+from pathlib import Path
+
+import numpy as np
+from loguru import logger as log
+
+from vta_video_overlay.config import Config, config, get_appdata_path
+from vta_video_overlay.cv_graph_overlay import CVGraphOverlay
+from vta_video_overlay.enums import GraphEngine
+from vta_video_overlay.graph_overlay import GraphOverlay
+from vta_video_overlay.graph_update import GraphUpdateLimiter
+
+GRAPH_STORE_DIR = "graph_cache"
+# Меняется при изменении отрисовки, чтобы старые хранилища не подхватывались
+GRAPH_STORE_VERSION = 1
+# Настройки, не влияющие на пиксели графика
+NON_VISUAL_SETTINGS = {"enabled", "prerender", "store_limit_mb"}
+# Задач на воркер: непрерывные куски, чтобы кеш фона осей оставался горячим
+CHUNKS_PER_WORKER = 4
+
+
+def create_graph_overlay(
+    data: np.ndarray, fps: float, width: int, height: int, time_window_sec: float
+) -> GraphUpdateLimiter:
+    """График выбранного в настройках движка с выбранной частотой перерисовки."""
+    graph_cls = (
+        CVGraphOverlay if config.graph.engine == GraphEngine.OPENCV else GraphOverlay
+    )
+    graph = graph_cls(
+        data=data,
+        fps=fps,
+        width=width,
+        height=height,
+        time_window_sec=time_window_sec,
+    )
+    return GraphUpdateLimiter(
+        graph,
+        fps=fps,
+        rate=config.graph.update_rate,
+        auto=config.graph.auto_update,
+    )
+
+
+def graph_store_key(
+    data: np.ndarray, fps: float, width: int, height: int, time_window_sec: float
+) -> str:
+    """Хеш всего, что влияет на пиксели графика."""
+    params = {
+        "version": GRAPH_STORE_VERSION,
+        "fps": fps,
+        "width": width,
+        "height": height,
+        "time_window": time_window_sec,
+        "graph": config.graph.model_dump(mode="json", exclude=NON_VISUAL_SETTINGS),
+        "font_size": config.text.additional_size,
+    }
+    h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+    h.update(np.ascontiguousarray(data, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def get_store_dir() -> Path:
+    path = get_appdata_path() / GRAPH_STORE_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# --- Процесс-воркер ---
+_worker_args: tuple | None = None
+_worker_graph = None
+
+
+def init_graph_worker(
+    cfg: Config, data: np.ndarray, fps: float, width: int, height: int, time_window_sec: float
+):
+    """
+    Только запоминает аргументы: исключение в initializer пул перезапускает
+    бесконечно, поэтому график создается в задаче (get_worker_graph).
+    """
+    global _worker_args
+    _worker_args = (cfg, data, fps, width, height, time_window_sec)
+
+
+def get_worker_graph() -> GraphUpdateLimiter:
+    """График выбранного движка текущего воркера, создается при первой задаче."""
+    global _worker_graph
+    if _worker_graph is None:
+        if _worker_args is None:
+            raise RuntimeError("Graph worker is not initialized")
+        cfg, data, fps, width, height, time_window_sec = _worker_args
+        config.replace_with(cfg)
+        _worker_graph = create_graph_overlay(
+            data=data, fps=fps, width=width, height=height, time_window_sec=time_window_sec
+        )
+    return _worker_graph
+
+
+def render_tiles(
+    graph: GraphUpdateLimiter, path: str, shape: tuple[int, ...], start: int, stop: int
+) -> tuple[int, int]:
+    """
+    Рендерит тайлы [start, stop) прямо в файл хранилища.
+    Возвращает (перерисовки графика, перерисовки фона осей).
+    """
+    tiles = np.memmap(path, dtype=np.uint8, mode="r+", shape=shape)
+    renders, redraws = graph.renders, graph.redraws
+    for idx in range(start, stop):
+        tiles[idx] = graph.get_frame_overlay(idx)
+    tiles.flush()
+    del tiles
+    return graph.renders - renders, graph.redraws - redraws
+
+
+def render_tiles_in_worker(
+    path: str, shape: tuple[int, ...], start: int, stop: int
+) -> tuple[int, int]:
+    return render_tiles(get_worker_graph(), path, shape, start, stop)
+
+
+class GraphStore:
+    """
+    Заранее отрисованные BGRA-кадры графика в файле на диске (np.memmap).
+    График зависит только от данных скорости, fps и размера, но не от пикселей
+    видео, поэтому все кадры рендерятся параллельно до экспорта, а FrameRenderer
+    лишь берет готовый тайл по индексу. Файл называется по хешу данных и
+    настроек и переиспользуется повторными экспортами и предпросмотром.
+    """
+
+    def __init__(self, tiles: np.memmap, renders: int = 0, redraws: int = 0):
+        self.tiles = tiles
+        # Перерисовки графика и фона осей при заполнении (для статистики)
+        self.renders = renders
+        self.redraws = redraws
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def get_frame_overlay(self, current_idx: int) -> np.ndarray:
+        """Готовый тайл кадра (только для чтения)."""
+        return self.tiles[min(current_idx, len(self.tiles) - 1)]
+
+    @staticmethod
+    def paths(key: str) -> tuple[Path, Path]:
+        store_dir = get_store_dir()
+        return store_dir / f"{key}.bgra", store_dir / f"{key}.json"
+
+    @classmethod
+    def open(cls, key: str) -> "GraphStore | None":
+        """Открывает готовое хранилище; None, если его нет или оно повреждено."""
+        tiles_path, meta_path = cls.paths(key)
+        # Файл тайлов появляется только после полного заполнения
+        if not tiles_path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            shape = (meta["frames"], meta["height"], meta["width"], 4)
+            if tiles_path.stat().st_size != math.prod(shape):
+                raise ValueError("unexpected file size")
+            tiles = np.memmap(tiles_path, dtype=np.uint8, mode="r", shape=shape)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"Broken graph store {key[:12]}: {e}")
+            return None
+        # Время доступа для вытеснения старых хранилищ
+        os.utime(tiles_path)
+        return cls(
+            tiles=tiles, renders=meta.get("renders", 0), redraws=meta.get("redraws", 0)
+        )
+
+    @classmethod
+    def build(
+        cls,
+        data: np.ndarray,
+        fps: float,
+        width: int,
+        height: int,
+        time_window_sec: float,
+        workers: int,
+    ) -> "GraphStore | None":
+        """
+        Возвращает хранилище для этих данных, при необходимости заполняя его
+        в пуле процессов. None - хранилище не влезает в лимит или диск.
+        """
+        key = graph_store_key(data, fps, width, height, time_window_sec)
+        store = cls.open(key)
+        if store is not None:
+            log.info(f"Reusing pre-rendered graph ({len(store)} frames)")
+            return store
+
+        shape = (len(data), height, width, 4)
+        size_mb = math.prod(shape) / 2**20
+        limit_mb = config.graph.store_limit_mb
+        if not len(data) or size_mb > limit_mb:
+            log.warning(
+                f"Graph store of {size_mb:.0f} MB exceeds the {limit_mb} MB limit, "
+                "rendering the graph on the fly"
+            )
+            return None
+
+        evict_stores(limit_mb - size_mb)
+        tiles_path, meta_path = cls.paths(key)
+        part_path = tiles_path.with_suffix(".part")
+        try:
+            # Заранее создаем файл нужного размера: воркеры пишут в свои диапазоны
+            np.memmap(part_path, dtype=np.uint8, mode="w+", shape=shape).flush()
+            renders, redraws = cls._fill(
+                str(part_path), shape, data, fps, width, height, time_window_sec, workers
+            )
+            meta = {
+                "frames": shape[0],
+                "height": height,
+                "width": width,
+                "renders": renders,
+                "redraws": redraws,
+            }
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+            part_path.replace(tiles_path)
+        except OSError as e:
+            log.warning(f"Failed to pre-render graph: {e}")
+            part_path.unlink(missing_ok=True)
+            return None
+        log.info(f"Pre-rendered graph: {shape[0]} frames, {size_mb:.0f} MB")
+        return cls.open(key)
+
+    @staticmethod
+    def _fill(
+        path: str,
+        shape: tuple[int, ...],
+        data: np.ndarray,
+        fps: float,
+        width: int,
+        height: int,
+        time_window_sec: float,
+        workers: int,
+    ) -> tuple[int, int]:
+        total = shape[0]
+        if workers <= 1:
+            graph = create_graph_overlay(data, fps, width, height, time_window_sec)
+            return render_tiles(graph, path, shape, 0, total)
+
+        chunk = math.ceil(total / (workers * CHUNKS_PER_WORKER))
+        log.info(f"Pre-rendering graph with {workers} workers")
+        # spawn: fork небезопасен для процесса с потоками Qt
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes=workers,
+            initializer=init_graph_worker,
+            initargs=(
+                config.model_copy(deep=True),
+                data,
+                fps,
+                width,
+                height,
+                time_window_sec,
+            ),
+        ) as pool:
+            results = [
+                pool.apply_async(
+                    render_tiles_in_worker,
+                    (path, shape, start, min(start + chunk, total)),
+                )
+                for start in range(0, total, chunk)
+            ]
+            counts = [result.get() for result in results]
+        return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+def evict_stores(limit_mb: float):
+    """Удаляет давно не использованные хранилища, пока остальные не влезут в лимит."""
+    stores = sorted(get_store_dir().glob("*.bgra"), key=lambda p: p.stat().st_mtime)
+    used_mb = sum(p.stat().st_size for p in stores) / 2**20
+    for tiles_path in stores:
+        if used_mb <= limit_mb:
+            break
+        used_mb -= tiles_path.stat().st_size / 2**20
+        try:
+            tiles_path.unlink()
+            tiles_path.with_suffix(".json").unlink(missing_ok=True)
+        except OSError as e:
+            # На Windows файл может быть открыт другим экземпляром
+            log.warning(f"Could not remove graph store {tiles_path.name}: {e}")
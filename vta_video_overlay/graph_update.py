@@ -0,0 +1,101 @@
+import numpy as np
+
+from vta_video_overlay.graph_axes import GraphLimits
+from vta_video_overlay.graph_overlay import AXES_RECT
+
+# Сдвиг на экране (в пикселях), начиная с которого график перерисовывается
+AUTO_THRESHOLD_PX = 1.0
+
+
+def rate_sources(total: int, fps: float, rate: float) -> np.ndarray:
+    """Кадры перерисовки при фиксированной частоте: первый кадр каждого периода."""
+    idx = np.arange(total)
+    if rate <= 0 or rate >= fps:
+        return idx
+    periods = np.floor(idx * (rate / fps))
+    # Первый кадр периода: наименьший индекс не раньше его начала
+    return np.minimum(np.ceil(periods * (fps / rate) - 1e-9), idx).astype(np.int64)
+
+
+def auto_sources(
+    limits: GraphLimits, data: np.ndarray, fps: float, width: int, height: int
+) -> np.ndarray:
+    """
+    Кадры перерисовки в авто-режиме: график перерисовывается, только когда
+    маркер или уже нарисованная линия сдвинулись на экране хотя бы на пиксель.
+    Считается за один проход, поэтому одинаково в любом процессе и с любого кадра.
+    """
+    axes_w = (AXES_RECT["right"] - AXES_RECT["left"]) * width
+    axes_h = (AXES_RECT["top"] - AXES_RECT["bottom"]) * height
+    total = len(limits)
+    sources = np.empty(total, dtype=np.int64)
+    values = data.tolist()
+
+    def mapping(idx: int) -> tuple[float, float, float, float, float]:
+        """(x_min, пикселей на секунду, y_min, y_max, пикселей на единицу)."""
+        (x_min, x_max), (y_min, y_max) = limits.at(idx)
+        return x_min, axes_w / (x_max - x_min), y_min, y_max, axes_h / (y_max - y_min)
+
+    def px(m, t: float) -> float:
+        return (t - m[0]) * m[1]
+
+    def py(m, y: float) -> float:
+        return (m[3] - y) * m[4]
+
+    last = 0
+    last_map = mapping(0)
+    for idx in range(total):
+        cur_map = mapping(idx)
+        t, lt = idx / fps, last / fps
+        moves = (
+            # Маркер
+            abs(px(cur_map, t) - px(last_map, lt)),
+            abs(py(cur_map, values[idx]) - py(last_map, values[last])),
+            # Уже нарисованная линия: левый край окна и прошлое положение маркера
+            abs(px(cur_map, cur_map[0]) - px(last_map, cur_map[0])),
+            abs(px(cur_map, lt) - px(last_map, lt)),
+            # Масштаб по Y на границах осей
+            abs(py(cur_map, cur_map[2]) - py(last_map, cur_map[2])),
+            abs(py(cur_map, cur_map[3]) - py(last_map, cur_map[3])),
+        )
+        if max(moves) >= AUTO_THRESHOLD_PX:
+            last, last_map = idx, cur_map
+        sources[idx] = last
+    return sources
+
+
+class GraphUpdateLimiter:
+    """
+    Обертка графика, перерисовывающая его не на каждом кадре: промежуточные
+    кадры получают последний отрисованный тайл. Кадр-источник для каждого
+    индекса определен заранее, поэтому результат не зависит от порядка
+    запросов (воркеры, предпросмотр, хранилище графика).
+    """
+
+    def __init__(self, graph, fps: float, rate: float = 0.0, auto: bool = False):
+        self.graph = graph
+        total = len(graph.limits)
+        if auto:
+            self.sources = auto_sources(
+                graph.limits, graph.data, fps, graph.width, graph.height
+            )
+        else:
+            self.sources = rate_sources(total, fps, rate)
+        self.renders = 0
+        self._tile: np.ndarray | None = None
+        self._tile_idx = -1
+
+    @property
+    def redraws(self) -> int:
+        return self.graph.redraws
+
+    def get_frame_overlay(self, current_idx: int) -> np.ndarray:
+        # Лишние кадры за пределами данных рисуем как есть
+        source = current_idx
+        if current_idx < len(self.sources):
+            source = int(self.sources[current_idx])
+        if self._tile is None or source != self._tile_idx:
+            self._tile = self.graph.get_frame_overlay(source)
+            self._tile_idx = source
+            self.renders += 1
+        return self._tile
@@ -33,7 +33,6 @@ def open_file_explorer(path: Path):
 class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     # Сигналы для общения с воркером
     worker_data_signal = QtCore.Signal(object, object)  # data, crop_rect
-    worker_request_signal = QtCore.Signal(int, object, object)  # frame_index, data, crop_rect
 
     def __init__(self, controller: Controller):
         super().__init__()
@@ -84,6 +83,21 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.actionPreviewGraph.triggered.connect(self.show_graph_preview)
         self.menuOptions.addAction(self.actionPreviewGraph)
 
+        # Профиль кодировщика итогового видео
+        self.menuEncoderProfile = self.menuOptions.addMenu(self.tr("Encoder profile"))
+        self.encoderProfileGroup = QtGui.QActionGroup(self)
+        self.encoderProfileGroup.setExclusive(True)
+        profile_names = {"": self.tr("Default ({codec})").format(codec=config.export.codec)}
+        profile_names.update({name: name for name in config.export.profiles})
+        for name, title in profile_names.items():
+            action = QtGui.QAction(title, self)
+            action.setCheckable(True)
+            action.setChecked(name == config.export.active_profile)
+            action.setData(name)
+            self.encoderProfileGroup.addAction(action)
+            self.menuEncoderProfile.addAction(action)
+        self.encoderProfileGroup.triggered.connect(self.select_encoder_profile)
+
         # --- НАСТРОЙКА UI ПРЕДПРОСМОТРА ---
         
         # 1. Слайдер
@@ -166,7 +180,6 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         # Подключение сигналов (только воркер-специфичные)
         self.preview_thread.started.connect(self.worker.init_video)
         self.worker_data_signal.connect(self.worker.update_data)
-        self.worker_request_signal.connect(self.worker.request_frame)
         self.worker.frame_ready.connect(self.handle_frame_ready)
         
         # Запуск
@@ -205,7 +218,8 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         
         data = self.controller.pipeline.data
         crop_rect = self.controller.pipeline.crop_rect
-        self.worker_request_signal.emit(frame_index, data, crop_rect)
+        # Вызов из потока интерфейса: воркер оставляет только последний запрос
+        self.worker.request_frame(frame_index, data, crop_rect)
 
     @QtCore.Slot(object, float)
     def handle_frame_ready(self, pixmap, time_sec):
@@ -369,6 +383,14 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         if self.slider.isEnabled():
             self.request_preview_update(self.slider.value())
 
+    @QtCore.Slot(QtGui.QAction)
+    def select_encoder_profile(self, action: QtGui.QAction):
+        # Выбор в интерфейсе заменяет профиль из командной строки и сохраняется
+        config.export.profile = action.data()
+        config.export.session_profile = None
+        log.info(f"Encoder profile: {config.export.profile or config.export.codec}")
+        config.update()
+
     @QtCore.Slot()
     def show_graph_preview(self):
         data = self.controller.pipeline.data
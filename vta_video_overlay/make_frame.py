@@ -1,11 +1,88 @@
+from functools import partial
+from typing import Callable
+
 import cv2
 import numpy as np
 from PySide6 import QtCore
 
+from vta_video_overlay.blending import blend_straight
 from vta_video_overlay.config import config
 from vta_video_overlay.crop_selection_widgets import RectangleGeometry
 from vta_video_overlay.enums import Alignment
 from vta_video_overlay.opencv_frame import CVFrame
+from vta_video_overlay.static_layer import StaticLayer
+from vta_video_overlay.text_cache import TextTileCache
+from vta_video_overlay.text_draw import BBox, draw_text
+
+
+def _put_logo(cvframe: CVFrame):
+    cvframe.put_img(
+        overlay_img=config.logo_img,
+        x=cvframe.image.shape[1],
+        y=cvframe.image.shape[0],
+        align=Alignment.BOTTOM_RIGHT,
+    )
+
+
+def _record_bbox(
+    put_text: Callable[..., BBox], touched: list[BBox]
+) -> Callable[..., BBox]:
+    """Обертка put_text, запоминающая bbox нарисованных строк."""
+
+    def put_and_record(**kwargs) -> BBox:
+        bbox = put_text(**kwargs)
+        touched.append(bbox)
+        return bbox
+
+    return put_and_record
+
+
+def _draw_static_text(
+    put_text: Callable[..., BBox],
+    frame_height: int,
+    operator_name: str,
+    sample_name: str,
+    add_text: str | None,
+):
+    """Нижние подписи: дополнительный текст, оператор, образец."""
+    if add_text is not None:
+        bbox = put_text(
+            text=add_text,
+            xy=(config.text.margin_x, frame_height - config.text.margin_y),
+            align=Alignment.BOTTOM_LEFT,
+            small=True,
+        )
+        xy = (config.text.margin_x, bbox[1] - config.text.line_spacing)
+    else:
+        xy = (config.text.margin_x, frame_height - config.text.margin_y)
+    
+    bbox = put_text(
+        text=operator_name, xy=xy, align=Alignment.BOTTOM_LEFT, small=True
+    )
+    bbox = put_text(
+        text=sample_name,
+        xy=(config.text.margin_x, bbox[1] - config.text.line_spacing),
+        align=Alignment.BOTTOM_LEFT,
+    )
+
+
+def draw_static_overlay(
+    cvframe: CVFrame,
+    operator_name: str,
+    sample_name: str,
+    add_text: str | None,
+) -> CVFrame:
+    """Рисует элементы, не меняющиеся за время видео: логотип и нижние подписи."""
+    if config.logo_enabled:
+        _put_logo(cvframe)
+    _draw_static_text(
+        partial(draw_text, cvframe.image),
+        frame_height=cvframe.size.height,
+        operator_name=operator_name,
+        sample_name=sample_name,
+        add_text=add_text,
+    )
+    return cvframe
 
 
 def make_frame(
@@ -19,8 +96,17 @@ def make_frame(
     operator_name: str,
     sample_name: str,
     add_text: str | None,
+    static_layer: StaticLayer | None = None,
+    text_cache: TextTileCache | None = None,
+    touched: list[BBox] | None = None,
 ):
-    """Создает кадр с наложением данных и графика."""
+    """
+    Создает кадр с наложением данных и графика.
+    Если передан static_layer, неизменные элементы не рисуются заново,
+    а накладываются готовым слоем. С text_cache строки данных берутся
+    из кеша готовых тайлов. В touched добавляются прямоугольники
+    (x0, y0, x1, y1), в которых оверлей менял пиксели.
+    """
     cvframe = CVFrame(image=img)
     if crop_rect is not None:
         cvframe.crop_by_rect(crop_rect)
@@ -38,39 +124,37 @@ def make_frame(
         
         # Проверяем, влезает ли график
         if x_offset > 0 and y_offset + gh < fh and x_offset + gw <= fw:
-            # Вырезаем область интереса (ROI) из основного кадра
+            # Смешивание в uint16 прямо в области кадра
             roi = cvframe.image[y_offset:y_offset+gh, x_offset:x_offset+gw]
+            blend_straight(roi, graph_img)
+            if touched is not None:
+                touched.append((x_offset, y_offset, x_offset + gw, y_offset + gh))
             
-            # Разделяем каналы графика (BGR и Alpha)
-            overlay_bgr = graph_img[:, :, :3]
-            overlay_alpha = graph_img[:, :, 3] / 255.0
-            
-            # Альфа-блендинг: (Overlay * Alpha) + (ROI * (1 - Alpha))
-            blended = (overlay_bgr * overlay_alpha[..., None] + 
-                       roi * (1.0 - overlay_alpha[..., None]))
-            
-            # Записываем обратно в кадр
-            cvframe.image[y_offset:y_offset+gh, x_offset:x_offset+gw] = blended.astype(np.uint8)
-            
-    if config.logo_enabled:
-        cvframe.put_img(
-            overlay_img=config.logo_img,
-            x=cvframe.image.shape[1],
-            y=cvframe.image.shape[0],
-            align=Alignment.BOTTOM_RIGHT,
-        )
+    if static_layer is None and config.logo_enabled:
+        _put_logo(cvframe)
+        if touched is not None:
+            lh, lw = config.logo_img.shape[:2]
+            fh, fw = cvframe.image.shape[:2]
+            touched.append((fw - lw, fh - lh, fw, fh))
     
-    pilframe = cvframe.to_pilframe()
+    # Весь текст рисуется прямо в BGR-кадр, без конвертации кадра целиком
+    put_text: Callable[..., BBox]
+    if text_cache is not None:
+        put_text = partial(text_cache.put_text, cvframe.image)
+    else:
+        put_text = partial(draw_text, cvframe.image)
+    if touched is not None:
+        put_text = _record_bbox(put_text, touched)
     
     # Отрисовка времени
-    bbox = pilframe.put_text(
+    bbox = put_text(
         text=QtCore.QCoreApplication.tr("t(s): {time:.1f}").format(time=time),  # type: ignore
         xy=(config.text.margin_x, config.text.margin_y),
         align=Alignment.TOP_LEFT,
     )
     
     # Отрисовка EMF ниже времени
-    bbox = pilframe.put_text(
+    bbox = put_text(
         text=QtCore.QCoreApplication.tr("E(mV): {emf:.2f}").format(emf=emf),  # type: ignore
         xy=(config.text.margin_x, config.text.line_spacing + bbox[3]),
         align=Alignment.TOP_LEFT,
@@ -79,7 +163,7 @@ def make_frame(
     # Отрисовка Температуры и Скорости
     if temp is not None:
         # Температура
-        bbox = pilframe.put_text(
+        bbox = put_text(
             text=f"T(°C): {temp:.0f}",
             xy=(config.text.margin_x, config.text.line_spacing + bbox[3]),
             align=Alignment.TOP_LEFT,
@@ -87,30 +171,26 @@ def make_frame(
         
         # Скорость отображается ВСЕГДА (4-я строка)
         if temp_speed is not None:
-            bbox = pilframe.put_text(
+            bbox = put_text(
                 text=QtCore.QCoreApplication.tr("dT/dt(°C/s): {speed:.2f}").format(speed=temp_speed), # type: ignore
                 xy=(config.text.margin_x, config.text.line_spacing + bbox[3]),
                 align=Alignment.TOP_LEFT,
             )
     
-    if add_text is not None:
-        bbox = pilframe.put_text(
-            text=add_text,
-            xy=(config.text.margin_x, cvframe.size.height - config.text.margin_y),
-            align=Alignment.BOTTOM_LEFT,
-            small=True,
+    if static_layer is None:
+        put_static_text = partial(draw_text, cvframe.image)
+        _draw_static_text(
+            put_static_text
+            if touched is None
+            else _record_bbox(put_static_text, touched),
+            frame_height=cvframe.size.height,
+            operator_name=operator_name,
+            sample_name=sample_name,
+            add_text=add_text,
         )
-        xy = (config.text.margin_x, bbox[1] - config.text.line_spacing)
-    else:
-        xy = (config.text.margin_x, cvframe.size.height - config.text.margin_y)
     
-    bbox = pilframe.put_text(
-        text=operator_name, xy=xy, align=Alignment.BOTTOM_LEFT, small=True
-    )
-    bbox = pilframe.put_text(
-        text=sample_name,
-        xy=(config.text.margin_x, bbox[1] - config.text.line_spacing),
-        align=Alignment.BOTTOM_LEFT,
-    )
-    cvframe = CVFrame.from_pilframe(frame=pilframe)
+    if static_layer is not None:
+        static_layer.apply(cvframe.image)
+        if touched is not None:
+            touched.extend(region.rect for region in static_layer.regions)
     return cvframe
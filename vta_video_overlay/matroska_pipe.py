@@ -0,0 +1,103 @@
+"""
+Минимальный Matroska-поток сырых BGR-кадров с явными таймштампами.
+Rawvideo через pipe не несет времени кадров, поэтому ffmpeg получает
+кадры в Matroska (V_UNCOMPRESSED): каждый кадр - отдельный кластер
+со своим временем в миллисекундах.
+"""
+
+from typing import IO
+
+import numpy as np
+
+# Неизвестный размер (8-байтовый vint из единиц) - для потокового сегмента
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+# Время в Matroska в единицах TimestampScale (нс): 1 мс
+TIMESTAMP_SCALE = 1_000_000
+# FourCC формата пикселей для ColourSpace (как в таблице rawvideo ffmpeg)
+RAW_FOURCC = {"bgr24": b"BGR\x18", "yuv420p": b"I420"}
+
+
+def ebml_size(size: int) -> bytes:
+    """Размер элемента: всегда 8-байтовый vint."""
+    return (size | (1 << 56)).to_bytes(8, "big")
+
+
+def ebml_element(element_id: int, payload: bytes) -> bytes:
+    # ID хранится вместе с маркером длины, поэтому пишется как есть
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + ebml_size(len(payload)) + payload
+
+
+def ebml_uint(element_id: int, value: int) -> bytes:
+    return ebml_element(element_id, value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def ebml_string(element_id: int, value: str) -> bytes:
+    return ebml_element(element_id, value.encode("ascii"))
+
+
+class MatroskaRawWriter:
+    """Пишет сырые кадры (bgr24 или yuv420p) с таймштампами в поток Matroska."""
+
+    def __init__(self, stream: IO[bytes], width: int, height: int, pix_fmt: str = "bgr24"):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.fourcc = RAW_FOURCC[pix_fmt]
+
+    def write_header(self):
+        header = ebml_element(
+            0x1A45DFA3,  # EBML
+            ebml_uint(0x4286, 1)  # EBMLVersion
+            + ebml_uint(0x42F7, 1)  # EBMLReadVersion
+            + ebml_uint(0x42F2, 4)  # EBMLMaxIDLength
+            + ebml_uint(0x42F3, 8)  # EBMLMaxSizeLength
+            + ebml_string(0x4282, "matroska")  # DocType
+            + ebml_uint(0x4287, 4)  # DocTypeVersion
+            + ebml_uint(0x4285, 2),  # DocTypeReadVersion
+        )
+        # Segment неизвестного размера: поток пишется без перемоток
+        header += b"\x18\x53\x80\x67" + UNKNOWN_SIZE
+        header += ebml_element(
+            0x1549A966,  # Info
+            ebml_uint(0x2AD7B1, TIMESTAMP_SCALE)  # TimestampScale
+            + ebml_string(0x4D80, "vta_video_overlay")  # MuxingApp
+            + ebml_string(0x5741, "vta_video_overlay"),  # WritingApp
+        )
+        video = ebml_element(
+            0xE0,  # Video
+            ebml_uint(0xB0, self.width)  # PixelWidth
+            + ebml_uint(0xBA, self.height)  # PixelHeight
+            + ebml_element(0x2EB524, self.fourcc),  # ColourSpace
+        )
+        header += ebml_element(
+            0x1654AE6B,  # Tracks
+            ebml_element(
+                0xAE,  # TrackEntry
+                ebml_uint(0xD7, 1)  # TrackNumber
+                + ebml_uint(0x73C5, 1)  # TrackUID
+                + ebml_uint(0x83, 1)  # TrackType: video
+                + ebml_uint(0x9C, 0)  # FlagLacing
+                + ebml_string(0x86, "V_UNCOMPRESSED")  # CodecID
+                + video,
+            ),
+        )
+        self.stream.write(header)
+
+    def write_frame(self, image: np.ndarray, pts_ms: int):
+        """Кадр в отдельном кластере со временем pts_ms (>= 0)."""
+        # SimpleBlock: номер дорожки (vint), время относительно кластера, флаги (ключевой)
+        block_header = b"\x81\x00\x00\x80"
+        image = np.ascontiguousarray(image)
+        block_size = len(block_header) + image.nbytes
+        timestamp = ebml_uint(0xE7, pts_ms)  # Cluster Timestamp
+        simple_block_head = b"\xa3" + ebml_size(block_size)
+        cluster_size = len(timestamp) + len(simple_block_head) + block_size
+        self.stream.write(
+            b"\x1f\x43\xb6\x75"  # Cluster
+            + ebml_size(cluster_size)
+            + timestamp
+            + simple_block_head
+            + block_header
+        )
+        self.stream.write(image.data)
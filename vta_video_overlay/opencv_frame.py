@@ -4,8 +4,10 @@ import cv2
 import numpy as np
 from PySide6 import QtGui
 
+from vta_video_overlay.blending import blend_straight
 from vta_video_overlay.crop_selection_widgets import RectangleGeometry
 from vta_video_overlay.enums import Alignment
+from vta_video_overlay.glyph_atlas import get_atlas
 from vta_video_overlay.pil_frame import Image, PILFrame
 
 
@@ -14,6 +16,17 @@ class Size(NamedTuple):
     height: int
 
 
+def clamp_crop(rect: RectangleGeometry, width: int, height: int) -> tuple[int, int, int, int]:
+    """Прямоугольник кропа (x, y, w, h), ограниченный размером кадра."""
+    # Ensure crop coordinates are within image bounds
+    x = max(0, min(rect.x, width - 1))
+    y = max(0, min(rect.y, height - 1))
+    # Ensure crop dimensions are positive and don't exceed image bounds
+    crop_w = max(10, min(rect.w, width - x))  # Minimum 10 pixels width
+    crop_h = max(10, min(rect.h, height - y))  # Minimum 10 pixels height
+    return x, y, crop_w, crop_h
+
+
 class CVFrame:
     def __init__(self, image: cv2.typing.MatLike):
         self.image = image
@@ -26,7 +39,10 @@ class CVFrame:
         )
 
     def to_pilframe(self):
-        return PILFrame(image=Image.fromarray(self.image[:, :, ::-1]))
+        # cvtColor сразу дает непрерывный RGB-массив (одно копирование)
+        return PILFrame(
+            image=Image.fromarray(cv2.cvtColor(src=self.image, code=cv2.COLOR_BGR2RGB))
+        )
 
     def _update_size(self):
         self.size = Size(self.image.shape[1], self.image.shape[0])
@@ -49,13 +65,25 @@ class CVFrame:
     def crop_by_rect(self, rect: RectangleGeometry):
         # Validate crop parameters to prevent invalid operations
         h, w = self.image.shape[:2]
-        # Ensure crop coordinates are within image bounds
-        x = max(0, min(rect.x, w - 1))
-        y = max(0, min(rect.y, h - 1))
-        # Ensure crop dimensions are positive and don't exceed image bounds
-        crop_w = max(10, min(rect.w, w - x))  # Minimum 10 pixels width
-        crop_h = max(10, min(rect.h, h - y))  # Minimum 10 pixels height
-        self.crop(x, y, crop_w, crop_h)
+        self.crop(*clamp_crop(rect, w, h))
+
+    def resize(self, width: int, height: int):
+        self.image = cv2.resize(
+            self.image, (width, height), interpolation=cv2.INTER_AREA
+        )
+        self._update_size()
+
+    def put_text(
+        self,
+        text: str,
+        xy: tuple[int, int],
+        align: Alignment,
+        small: bool = False,
+    ):
+        """Рисует текст с фоном прямо в BGR-кадр через атлас глифов."""
+        return get_atlas(small=small).put_text(
+            image=self.image, text=text, xy=xy, align=align
+        )
 
     def put_img(
         self,
@@ -98,18 +126,8 @@ class CVFrame:
         img_y2 = img_y1 + (y2 - y1)
 
         cropped = overlay_img[img_y1:img_y2, img_x1:img_x2]
-        roi = self.image[y1:y2, x1:x2]
-
-        # Обработка прозрачности
-        if cropped.shape[2] == 4:
-            alpha = cropped[:, :, 3:4] / 255.0
-            color = cropped[:, :, :3]
-        else:
-            alpha = np.ones_like(roi[:, :, 0:1])
-            color = cropped
-
-        # Смешивание и вставка
-        blended = (color * alpha) + (roi * (1 - alpha))
-        self.image[y1:y2, x1:x2] = blended.astype(np.uint8)
+
+        # Смешивание прямо в области кадра
+        blend_straight(self.image[y1:y2, x1:x2], cropped)
 
         return self.image
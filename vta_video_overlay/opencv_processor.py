@@ -6,13 +6,18 @@ import cv2
 from loguru import logger as log
 from PySide6 import QtCore
 
+from vta_video_overlay.config import EncoderProfile, config
 from vta_video_overlay.crop_selection_widgets import RectangleGeometry
 from vta_video_overlay.data_collections import ProcessProgress
+from vta_video_overlay.ffmpeg_pipe import FFmpegEncoder
 from vta_video_overlay.video_data import VideoData
 from vta_video_overlay.video_context import VideoContext
-from vta_video_overlay.frame_renderer import FrameRenderer
+from vta_video_overlay.frame_renderer import FrameRenderer, prerender_graph
+from vta_video_overlay.parallel_renderer import resolve_workers
 
 CODEC: Final = "mp4v"
+# Промежуточный файл с временем кадров исходника: быстро и почти без потерь
+INTERMEDIATE_ENCODER: Final = EncoderProfile(codec="libx264", preset="ultrafast", crf=12)
 
 
 class CVProcessor(QtCore.QObject):
@@ -36,6 +41,14 @@ class CVProcessor(QtCore.QObject):
         # Открываем видео
         video_ctx = VideoContext.open(self.video_data.path)
         
+        prerender_graph(
+            video_ctx=video_ctx,
+            aligned=self.video_data.aligned,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+            workers=resolve_workers(config.export.workers),
+        )
+
         # Создаем рендерер
         renderer = FrameRenderer(
             video_ctx=video_ctx,
@@ -45,36 +58,44 @@ class CVProcessor(QtCore.QObject):
             graph_enabled=self.graph_enabled,
         )
         
-        # Размер после кропа
-        if self.crop_rect:
-            size = (self.crop_rect.w, self.crop_rect.h)
-        else:
-            size = (video_ctx.width, video_ctx.height)
+        # Размер после кропа и масштаба
+        size = (renderer.geometry.width, renderer.geometry.height)
         
         # Создаем writer
-        writer = cv2.VideoWriter(
-            str(self.path_output),
-            cv2.VideoWriter_fourcc(*CODEC),
-            video_ctx.fps,
-            size,
-        )
+        writer: cv2.VideoWriter | FFmpegEncoder
+        if config.export.source_timestamps:
+            # VideoWriter знает только постоянный fps - время кадров через ffmpeg
+            writer = FFmpegEncoder(
+                path_output=self.path_output,
+                width=size[0],
+                height=size[1],
+                fps=video_ctx.fps,
+                encoder=INTERMEDIATE_ENCODER,
+                timestamps=self.video_data.timestamps,
+            ).start()
+        else:
+            writer = cv2.VideoWriter(
+                str(self.path_output),
+                cv2.VideoWriter_fourcc(*CODEC),
+                video_ctx.fps,
+                size,
+            )
         
         # --- FPS TRACKING ---
         frame_times: list[float] = []
         fps_update_interval = 10
         
-        # Рендерим кадры
-        for idx in range(video_ctx.total_frames):
-            frame_start = time.perf_counter()
-            
-            frame = renderer.render_frame(idx)
-            if frame:
-                writer.write(frame.image)
-                self.progress_signal.emit(ProcessProgress(value=idx, frame=frame))
+        # Рендерим кадры (последовательное чтение без seek на каждый кадр)
+        frame_start = time.perf_counter()
+        for idx, img in video_ctx.iter_frames():
+            frame = renderer.render_image(img, idx)
+            writer.write(frame.image)
+            self.progress_signal.emit(ProcessProgress(value=idx, frame=frame))
             
             # Замер времени кадра
-            frame_time = time.perf_counter() - frame_start
-            frame_times.append(frame_time)
+            now = time.perf_counter()
+            frame_times.append(now - frame_start)
+            frame_start = now
             
             # Обновляем FPS каждые N кадров
             if len(frame_times) >= fps_update_interval:
@@ -83,6 +104,9 @@ class CVProcessor(QtCore.QObject):
                 self.fps_signal.emit(current_fps)
                 frame_times.clear()
         
-        writer.release()
+        if isinstance(writer, FFmpegEncoder):
+            writer.close()
+        else:
+            writer.release()
         video_ctx.close()
         log.info(self.tr("OpenCV has finished"))
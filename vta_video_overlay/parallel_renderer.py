@@ -0,0 +1,236 @@
+import bisect
+import multiprocessing
+import os
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.pool import AsyncResult, Pool
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+from loguru import logger as log
+
+from vta_video_overlay.config import Config, config
+from vta_video_overlay.crop_selection_widgets import RectangleGeometry
+from vta_video_overlay.data_file import Data
+
+# Память под отрендеренные кадры всех задач в работе, МБ
+RENDER_BUFFER_MB = 1024
+
+
+@dataclass
+class RenderJob:
+    """Все, что нужно воркеру для создания собственного FrameRenderer (picklable)."""
+    video_path: Path
+    operator: str
+    sample: str
+    time: np.ndarray
+    emf: np.ndarray
+    temp: np.ndarray | None
+    timestamps: np.ndarray
+    crop_rect: RectangleGeometry | None
+    graph_enabled: bool
+    config: Config
+
+    @classmethod
+    def create(
+        cls,
+        video_path: Path,
+        data: Data,
+        timestamps: np.ndarray,
+        crop_rect: RectangleGeometry | None,
+        graph_enabled: bool,
+    ) -> "RenderJob":
+        # Data - QObject, поэтому передаем только массивы и строки
+        return cls(
+            video_path=video_path,
+            operator=data.operator,
+            sample=data.sample,
+            time=data.time,
+            emf=data.emf,
+            temp=data.temp,
+            timestamps=timestamps,
+            crop_rect=crop_rect,
+            graph_enabled=graph_enabled,
+            config=config.model_copy(deep=True),
+        )
+
+    def to_data(self) -> Data:
+        data = Data()
+        data.operator = self.operator
+        data.sample = self.sample
+        data.time = self.time
+        data.emf = self.emf
+        data.temp = self.temp
+        return data
+
+
+def plan_ranges(
+    keyframes: Sequence[int], total_frames: int, max_frames: int
+) -> list[tuple[int, int]]:
+    """
+    Делит [0, total_frames) на непрерывные диапазоны не длиннее max_frames,
+    по возможности начинающиеся с ключевых кадров: воркер встает на ключевой
+    кадр одним seek и дальше декодирует подряд, без повторного декодирования
+    GOP. Если GOP длиннее max_frames, диапазон режется посередине GOP.
+    """
+    bounds = [0]
+    while bounds[-1] < total_frames:
+        start = bounds[-1]
+        limit = start + max(1, max_frames)
+        if limit >= total_frames:
+            bounds.append(total_frames)
+            break
+        # Последний ключевой кадр, при котором диапазон не длиннее лимита
+        pos = bisect.bisect_right(keyframes, limit) - 1
+        bounds.append(keyframes[pos] if pos >= 0 and keyframes[pos] > start else limit)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def resolve_workers(workers: int) -> int:
+    """0 - по числу ядер."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+# --- Состояние процесса-воркера ---
+_worker_job: RenderJob | None = None
+_worker_renderer = None
+_worker_app = None
+
+
+def init_worker(job: RenderJob):
+    """
+    Только запоминает задание. Исключение в initializer пул не пробрасывает,
+    а перезапускает воркеры бесконечно, поэтому все, что может упасть,
+    создается в задаче (get_worker_renderer) и приходит через AsyncResult.get().
+    """
+    global _worker_job
+    _worker_job = job
+
+
+def create_worker_renderer(job: RenderJob):
+    """Свой VideoContext, FrameRenderer и GraphOverlay процесса-воркера."""
+    global _worker_app
+
+    # Импорты внутри: модули рендера тянут Qt и matplotlib
+    from PySide6 import QtCore
+
+    from vta_video_overlay.frame_renderer import FrameRenderer
+    from vta_video_overlay.translation import install_translator
+    from vta_video_overlay.video_context import VideoContext
+
+    config.replace_with(job.config)
+
+    # Переводы строк оверлея (tr) требуют экземпляра приложения
+    _worker_app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    install_translator(_worker_app)
+
+    video_ctx = VideoContext.open(job.video_path)
+    return FrameRenderer(
+        video_ctx=video_ctx,
+        data=job.to_data(),
+        timestamps=job.timestamps,
+        crop_rect=job.crop_rect,
+        graph_enabled=job.graph_enabled,
+    )
+
+
+def get_worker_renderer():
+    """FrameRenderer текущего процесса-воркера, создается при первой задаче."""
+    global _worker_renderer
+    if _worker_renderer is None:
+        if _worker_job is None:
+            raise RuntimeError("Render worker is not initialized")
+        _worker_renderer = create_worker_renderer(_worker_job)
+    return _worker_renderer
+
+
+def render_chunk(start: int, stop: int) -> list[np.ndarray]:
+    """
+    Рендерит кадры [start, stop) по порядку. Seek только в начале, и то не
+    нужен, если воркер только что закончил предыдущий диапазон.
+    """
+    renderer = get_worker_renderer()
+    return [
+        renderer.render_image(img, idx).image
+        for idx, img in renderer.video_ctx.iter_frames(start, stop)
+    ]
+
+
+class ParallelRenderer:
+    """
+    Рендерит кадры в пуле процессов и отдает их строго по порядку.
+    Задачи - непрерывные диапазоны по ключевым кадрам: мелкие порции заставляли
+    бы каждого воркера заново декодировать GOP от ключевого кадра. Число кадров
+    в работе ограничено RENDER_BUFFER_MB, поэтому память не растет с длиной видео.
+    """
+
+    def __init__(
+        self,
+        job: RenderJob,
+        workers: int,
+        chunk_frames: int,
+        keyframes: Sequence[int] = (),
+        frame_bytes: int = 0,
+    ):
+        self.job = job
+        self.workers = resolve_workers(workers)
+        # Максимум задач в работе: по две на воркер, чтобы никто не простаивал
+        self.max_in_flight = self.workers * 2
+        # Длина диапазона: сколько влезает в буфер, но не меньше chunk_frames
+        buffer_frames = RENDER_BUFFER_MB * 2**20 // max(1, frame_bytes)
+        self.range_frames = max(1, chunk_frames, buffer_frames // self.max_in_flight)
+        self.keyframes = list(keyframes)
+        self.pool: Pool | None = None
+
+    def __enter__(self) -> "ParallelRenderer":
+        log.info(f"Starting {self.workers} render workers")
+        # spawn: fork небезопасен для процесса с потоками Qt
+        ctx = multiprocessing.get_context("spawn")
+        self.pool = ctx.Pool(
+            processes=self.workers, initializer=init_worker, initargs=(self.job,)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.pool is None:
+            return
+        if exc_type is None:
+            self.pool.close()
+        else:
+            self.pool.terminate()
+        self.pool.join()
+        self.pool = None
+
+    def frames(self, total_frames: int) -> Iterator[np.ndarray]:
+        """Выдает отрендеренные кадры по порядку индексов."""
+        if self.pool is None:
+            raise RuntimeError("Render pool is not started")
+        pending: deque[tuple[int, AsyncResult]] = deque()
+        ranges = plan_ranges(self.keyframes, total_frames, self.range_frames)
+        log.debug(f"Rendering {len(ranges)} ranges of up to {self.range_frames} frames")
+        bounds = iter(ranges)
+
+        def submit() -> None:
+            bound = next(bounds, None)
+            if bound is None or self.pool is None:
+                return
+            start, stop = bound
+            # Результаты собираются по порядку отправки - порядок кадров сохраняется
+            pending.append(
+                (stop - start, self.pool.apply_async(render_chunk, (start, stop)))
+            )
+
+        for _ in range(self.max_in_flight):
+            submit()
+
+        while pending:
+            expected, result = pending.popleft()
+            images = result.get()
+            submit()
+            yield from images
+            # Видео закончилось раньше, чем таймштампы
+            if len(images) < expected:
+                break
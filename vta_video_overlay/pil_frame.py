@@ -8,31 +8,44 @@ from vta_video_overlay.enums import Alignment
 
 FontType = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
 
-PILFONT: FontType
-PILFONTSMALL: FontType
 
-try:
-    # Пытаемся загрузить DejaVuSans (или то, что в конфиге)
-    PILFONT = ImageFont.truetype(FONT_FILENAME, config.text.main_size)
-    PILFONTSMALL = ImageFont.truetype(FONT_FILENAME, config.text.additional_size)
-except Exception as e:
+def load_font(size: int) -> FontType:
+    """Загружает шрифт оверлея нужного размера с фоллбэками."""
     try:
-        log.warning(f"Failed to load {FONT_FILENAME}: {e}. Trying system Arial...")
-        # Фоллбэк на Arial (есть почти везде)
-        PILFONT = ImageFont.truetype("arial.ttf", config.text.main_size)
-        PILFONTSMALL = ImageFont.truetype("arial.ttf", config.text.additional_size)
-    except Exception as e2:
-        log.error(f"Failed to load arial.ttf: {e2}")
-        log.error("Fallback to default PIL font (bitmap, ugly)")
-        # Самый крайний случай - встроенный растровый шрифт
-        PILFONT = ImageFont.load_default()
-        PILFONTSMALL = ImageFont.load_default()
+        # Пытаемся загрузить DejaVuSans (или то, что в конфиге)
+        return ImageFont.truetype(FONT_FILENAME, size)
+    except Exception as e:
+        try:
+            log.warning(f"Failed to load {FONT_FILENAME}: {e}. Trying system Arial...")
+            # Фоллбэк на Arial (есть почти везде)
+            return ImageFont.truetype("arial.ttf", size)
+        except Exception as e2:
+            log.error(f"Failed to load arial.ttf: {e2}")
+            log.error("Fallback to default PIL font (bitmap, ugly)")
+            # Самый крайний случай - встроенный растровый шрифт
+            return ImageFont.load_default()
+
+
+PILFONT: FontType = load_font(config.text.main_size)
+PILFONTSMALL: FontType = load_font(config.text.additional_size)
 
 
 class PILFrame:
     def __init__(self, image: Image.Image):
         self.image = image
 
+    def _blend_box(self, box: tuple[int, int, int, int], color: tuple[int, int, int]):
+        """Смешивает прямоугольник с цветом (непрозрачность BG_ALPHA) на месте."""
+        w, h = self.image.size
+        # Как у ImageDraw.rectangle, правая и нижняя границы входят в прямоугольник
+        box = (max(0, box[0]), max(0, box[1]), min(w, box[2] + 1), min(h, box[3] + 1))
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return
+        region = self.image.crop(box)
+        fill = (*color, 255) if region.mode == "RGBA" else color
+        solid = Image.new(region.mode, region.size, fill)
+        self.image.paste(Image.blend(region, solid, BG_ALPHA), box)
+
     def put_text(
         self,
         text: str,
@@ -67,17 +80,11 @@ class PILFrame:
             bbox[3] + pad,  # bottom
         )
         
-        # Рисование полупрозрачного фона через alpha blending
+        # Полупрозрачный фон смешивается только внутри своей области,
+        # без полнокадровых слоев и без перевода кадра в RGBA
         if bg_color is not None:
-            # Создаем временный слой для фона
-            bg_layer = Image.new('RGBA', self.image.size, (0, 0, 0, 0))
-            bg_draw = ImageDraw.Draw(bg_layer)
-            # Рисуем прямоугольник с BG_COLOR и alpha=0.6 (153/255)
-            bg_draw.rectangle(expanded_bbox, fill=(*bg_color, int(255 * BG_ALPHA)))
-            # Смешиваем с основным изображением
-            self.image = Image.alpha_composite(self.image.convert('RGBA'), bg_layer)
+            self._blend_box(expanded_bbox, bg_color)
         
         # Рисуем текст
-        draw = ImageDraw.Draw(self.image)
         draw.text(xy, text, fill=color[::-1], anchor=anchor, font=font)
         return expanded_bbox
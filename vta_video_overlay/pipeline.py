@@ -4,11 +4,14 @@ from pathlib import Path
 from loguru import logger as log
 from PySide6 import QtCore
 
+from vta_video_overlay.config import config
 from vta_video_overlay.crop_selection_widgets import RectangleGeometry
 from vta_video_overlay.data_collections import ProcessProgress, ProcessResult
 from vta_video_overlay.data_file import Data
 from vta_video_overlay.ffmpeg_utils import FFmpeg
 from vta_video_overlay.opencv_processor import CVProcessor
+from vta_video_overlay.segment_processor import SegmentProcessor
+from vta_video_overlay.stream_processor import StreamProcessor
 from vta_video_overlay.temp_dir_manager import TempDirManager
 from vta_video_overlay.video_data import VideoData
 
@@ -39,22 +42,45 @@ class Pipeline(QtCore.QThread):
         tmpfile2 = Path(self.tempdir / "out2.mp4")
 
         video_data = self._preconvert(tmpfile=tmpfile1)
+        if config.export.streaming and config.export.segments > 1:
+            self._segment_overlay(video_data=video_data)
+            return
+        if config.export.streaming:
+            self._stream_overlay(video_data=video_data)
+            return
         self._cv_overlay(video_data=video_data, tmpfile=tmpfile2)
         self._final_convert(tmpfile=tmpfile2)
 
+    def _has_timestamps(self) -> bool:
+        """
+        Выборка пакетов быстро отсеивает файлы без меток. Если она прошла,
+        решает полный проход: пакеты без меток бывают и в середине файла.
+        """
+        ffmpeg = FFmpeg()
+        if not ffmpeg.check_for_packets(video_path=self.video_path_input):
+            return False
+        return ffmpeg.check_all_packets(video_path=self.video_path_input)
+
     def _preconvert(self, tmpfile: Path):
-        if FFmpeg().check_for_packets(video_path=self.video_path_input):
+        if self._has_timestamps():
             file_to_overlay = self.video_path_input
             self.stage_progress.emit(ProcessProgress(value=100, frame=None))
             log.debug(self.tr("Skipped pre-conversion (timestamps exist)"))
         else:
             file_to_overlay = tmpfile
-            log.warning("Input video has no timestamps. Preconverting video...")
-            FFmpeg().convert_video(
-                path_input=self.video_path_input,
-                path_output=file_to_overlay,
-                signal=self.stage_progress,
-            )
+            log.warning("Input video has no timestamps. Remuxing with generated timestamps...")
+            # Перепаковка без перекодирования - секунды вместо минут
+            if FFmpeg().remux_with_genpts(
+                path_input=self.video_path_input, path_output=file_to_overlay
+            ):
+                self.stage_progress.emit(ProcessProgress(value=100, frame=None))
+            else:
+                log.warning("Remux did not help. Preconverting video...")
+                FFmpeg().convert_video(
+                    path_input=self.video_path_input,
+                    path_output=file_to_overlay,
+                    signal=self.stage_progress,
+                )
         
         # VideoData теперь сама рассчитывает скорость при инициализации
         video_data = VideoData(video_path=file_to_overlay, data=self.data)
@@ -74,9 +100,38 @@ class Pipeline(QtCore.QThread):
         self.stage_finished.emit((100.0, "3/3", "%"))
         return
 
+    def _stream_overlay(self, video_data: VideoData):
+        stream_agent = StreamProcessor(
+            video_data=video_data,
+            path_output=self.video_path_output,
+            audio_source=self.video_path_input,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+        )
+        stream_agent.progress_signal.connect(self.stage_progress.emit)
+        stream_agent.fps_signal.connect(self.fps_updated.emit)
+        stream_agent.run()
+        self.stage_finished.emit((100.0, "3/3", "%"))
+
+    def _segment_overlay(self, video_data: VideoData):
+        segment_agent = SegmentProcessor(
+            video_data=video_data,
+            path_output=self.video_path_output,
+            audio_source=self.video_path_input,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+            path_input=self.video_path_input,
+        )
+        segment_agent.progress_signal.connect(self.stage_progress.emit)
+        segment_agent.fps_signal.connect(self.fps_updated.emit)
+        segment_agent.run()
+        self.stage_finished.emit((100.0, "3/3", "%"))
+
     def _final_convert(self, tmpfile: Path):
         FFmpeg().convert_video(
             path_input=tmpfile,
             path_output=self.video_path_output,
             signal=self.stage_progress,
+            encoder=config.export.encoder(),
+            keep_timestamps=config.export.source_timestamps,
         )
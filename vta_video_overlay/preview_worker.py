@@ -1,25 +1,49 @@
+import threading
+
+from loguru import logger as log
 from PySide6 import QtCore
 
 from vta_video_overlay.config import config
 from vta_video_overlay.video_context import VideoContext
-from vta_video_overlay.frame_renderer import FrameRenderer
+from vta_video_overlay.frame_renderer import FrameRenderer, RenderAborted
 
 
 class PreviewWorker(QtCore.QObject):
+    """
+    Рендер кадров предпросмотра в отдельном потоке. Из запросов важен только
+    последний: ожидающий запрос заменяется новым, а идущий рендер прерывается
+    между стадиями, поэтому задержка не растет с числом запросов.
+    """
+
     # Сигнал: (QPixmap кадра, текущее время)
     frame_ready = QtCore.Signal(object, float)
     finished = QtCore.Signal()
+    # Будит поток воркера, когда появился запрос
+    _wake = QtCore.Signal()
 
     def __init__(self, video_path: str):
         super().__init__()
         self.video_path = video_path
         self.video_ctx: VideoContext | None = None
         self.renderer: FrameRenderer | None = None
+        self._lock = threading.Lock()
+        self._pending: tuple[int, object, object] | None = None
+        # Номер последнего запроса: рендер более старого прерывается
+        self._generation = 0
+        # Счетчики: запросы, замененные до начала рендера, прерванные, показанные
+        self.requested = 0
+        self.dropped = 0
+        self.aborted = 0
+        self.rendered = 0
+        # Слот выполняется в потоке воркера (queued-соединение)
+        self._wake.connect(self.process_pending)
 
     @QtCore.Slot()
     def init_video(self):
         """Открывает видео в рабочем потоке."""
-        self.video_ctx = VideoContext.open(self.video_path)
+        self.video_ctx = VideoContext.open(
+            self.video_path, cache_mb=config.preview.frame_cache_mb
+        )
 
     @QtCore.Slot(object, object)
     def update_data(self, data, crop_rect=None):
@@ -27,7 +51,7 @@ class PreviewWorker(QtCore.QObject):
         if data is None or self.video_ctx is None:
             self.renderer = None
             return
-        
+
         self.renderer = FrameRenderer(
             video_ctx=self.video_ctx,
             data=data,
@@ -36,28 +60,64 @@ class PreviewWorker(QtCore.QObject):
             graph_enabled=config.graph.enabled,
         )
 
-    @QtCore.Slot(int, object, object)
     def request_frame(self, frame_index: int, data, crop_rect):
-        """Генерирует кадр."""
+        """
+        Запрашивает кадр. Вызывается из потока интерфейса и не ждет рендера:
+        запрос заменяет ожидающий, текущий рендер прерывается.
+        """
+        with self._lock:
+            self.requested += 1
+            self._generation += 1
+            wake = self._pending is None
+            if not wake:
+                self.dropped += 1
+            self._pending = (frame_index, data, crop_rect)
+        if wake:
+            self._wake.emit()
+
+    @QtCore.Slot()
+    def process_pending(self):
+        """Рендерит последний запрошенный кадр."""
+        with self._lock:
+            request, self._pending = self._pending, None
+            generation = self._generation
+        if request is None:
+            return
+        frame_index, data, crop_rect = request
+
         # Проверяем, нужно ли пересоздать рендерер
         # Это нужно, если рендерера нет, ИЛИ если изменился кроп
         needs_update = (
-            self.renderer is None 
+            self.renderer is None
             or self.renderer.crop_rect != crop_rect
         )
 
         if needs_update:
             self.update_data(data, crop_rect)
-        
-        if self.renderer is None:
+
+        if self.renderer is None or self.video_ctx is None:
+            return
+
+        def is_stale() -> bool:
+            return self._generation != generation
+
+        try:
+            frame = self.renderer.render_frame(frame_index, abort=is_stale)
+            if frame and is_stale():
+                raise RenderAborted
+        except RenderAborted:
+            self.aborted += 1
             return
-        
-        frame = self.renderer.render_frame(frame_index)
         if frame:
+            self.rendered += 1
             time_sec = frame_index / self.video_ctx.fps
             self.frame_ready.emit(frame.to_pixmap(), time_sec)
 
     def cleanup(self):
+        log.debug(
+            f"Preview requests: {self.requested}, dropped {self.dropped}, "
+            f"aborted {self.aborted}, rendered {self.rendered}"
+        )
         if self.video_ctx:
             self.video_ctx.close()
         self.finished.emit()
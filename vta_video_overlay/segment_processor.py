@@ -0,0 +1,305 @@
+import bisect
+import hashlib
+import json
+import multiprocessing
+import queue
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger as log
+from PySide6 import QtCore
+
+from vta_video_overlay.config import EncoderProfile, config
+from vta_video_overlay.crop_selection_widgets import RectangleGeometry
+from vta_video_overlay.data_collections import ProcessProgress
+from vta_video_overlay.ffmpeg_pipe import FFmpegEncoder
+from vta_video_overlay.ffmpeg_utils import FFmpeg
+from vta_video_overlay.frame_renderer import prerender_graph
+from vta_video_overlay.graph_store import NON_VISUAL_SETTINGS
+from vta_video_overlay.parallel_renderer import (
+    RenderJob,
+    get_worker_renderer,
+    init_worker,
+    resolve_workers,
+)
+from vta_video_overlay.video_context import VideoContext
+from vta_video_overlay.video_data import VideoData
+
+MANIFEST_NAME = "manifest.json"
+
+
+def split_at_keyframes(
+    keyframes: list[int], total_frames: int, segments: int
+) -> list[tuple[int, int]]:
+    """Делит [0, total_frames) на ~segments частей, начинающихся с ключевых кадров."""
+    starts = {0}
+    for i in range(1, segments):
+        target = total_frames * i // segments
+        # Ближайший к целевой границе ключевой кадр
+        pos = bisect.bisect_left(keyframes, target)
+        candidates = keyframes[max(0, pos - 1) : pos + 1]
+        if not candidates:
+            continue
+        nearest = min(candidates, key=lambda k: abs(k - target))
+        if 0 < nearest < total_frames:
+            starts.add(nearest)
+    bounds = sorted(starts) + [total_frames]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# --- Процесс-воркер ---
+_progress_queue = None
+PROGRESS_INTERVAL = 10
+
+
+def init_segment_worker(job: RenderJob, progress_queue):
+    """Только запоминает аргументы: рендерер создается в первой задаче."""
+    global _progress_queue
+    init_worker(job)
+    _progress_queue = progress_queue
+
+
+def render_segment(
+    start: int,
+    stop: int,
+    path_part: str,
+    path_done: str,
+    fps: float,
+    profile: EncoderProfile,
+) -> int:
+    """Рендерит и кодирует кадры [start, stop) в отдельный файл сегмента."""
+    renderer = get_worker_renderer()
+    timestamps = None
+    if config.export.source_timestamps:
+        # Сегмент начинается с нуля: concat сам сдвигает его за предыдущие
+        timestamps = renderer.aligned.timestamps[start:stop]
+        timestamps = timestamps - timestamps[0] if len(timestamps) else timestamps
+    encoder: FFmpegEncoder | None = None
+    reported = 0
+    try:
+        for idx, img in renderer.video_ctx.iter_frames(start, stop):
+            frame = renderer.render_image(img, idx)
+            if encoder is None:
+                encoder = FFmpegEncoder(
+                    path_output=Path(path_part),
+                    width=frame.size.width,
+                    height=frame.size.height,
+                    fps=fps,
+                    encoder=profile,
+                    timestamps=timestamps,
+                ).start()
+            encoder.write(frame.image)
+            done = idx - start + 1
+            if _progress_queue is not None and done - reported >= PROGRESS_INTERVAL:
+                _progress_queue.put(done - reported)
+                reported = done
+    except BaseException:
+        if encoder is not None:
+            encoder.abort()
+        raise
+    if encoder is None:
+        raise RuntimeError(f"No frames rendered for segment {start}-{stop}")
+    encoder.close()
+    # Сегмент считается готовым только после успешного завершения ffmpeg
+    Path(path_part).replace(path_done)
+    if _progress_queue is not None:
+        _progress_queue.put(stop - start - reported)
+    return stop - start
+
+
+class SegmentProcessor(QtCore.QObject):
+    """
+    Посегментный экспорт: таймлайн режется по ключевым кадрам, каждый сегмент
+    рендерится и кодируется независимым воркером, затем сегменты склеиваются
+    concat-демуксером без перекодирования. Готовые сегменты сохраняются рядом с
+    выходным файлом, поэтому прерванный экспорт продолжается с места остановки.
+    """
+
+    progress_signal = QtCore.Signal(ProcessProgress)
+    fps_signal = QtCore.Signal(float)
+
+    def __init__(
+        self,
+        video_data: VideoData,
+        path_output: Path,
+        audio_source: Path | None = None,
+        crop_rect: RectangleGeometry | None = None,
+        graph_enabled: bool = True,
+        path_input: Path | None = None,
+    ):
+        super().__init__()
+        self.video_data = video_data
+        # Исходный файл: video_data.path может быть временной перепаковкой,
+        # у которой путь и mtime меняются при каждом запуске
+        self.path_input = Path(path_input or video_data.path)
+        self.path_output = path_output
+        self.audio_source = audio_source
+        self.crop_rect = crop_rect
+        self.graph_enabled = graph_enabled
+        self.parts_dir = path_output.with_name(path_output.name + ".parts")
+
+    def run(self):
+        total_frames = len(self.video_data.timestamps)
+        keyframes = FFmpeg().get_keyframe_indices(self.video_data.path)
+        bounds = split_at_keyframes(
+            keyframes=keyframes,
+            total_frames=total_frames,
+            segments=config.export.segments,
+        )
+        self._prepare_parts_dir(bounds)
+
+        suffix = self.path_output.suffix
+        segments = [self.parts_dir / f"seg_{i:04d}{suffix}" for i in range(len(bounds))]
+        todo = [
+            (bound, segment)
+            for bound, segment in zip(bounds, segments)
+            if not segment.exists()
+        ]
+        if len(todo) < len(bounds):
+            log.info(
+                self.tr("Resuming export: {done} of {total} segments are ready").format(
+                    done=len(bounds) - len(todo), total=len(bounds)
+                )
+            )
+
+        if todo:
+            done_frames = total_frames - sum(stop - start for (start, stop), _ in todo)
+            self._render_segments(todo=todo, done_frames=done_frames)
+
+        FFmpeg().concat_segments(
+            segments=segments,
+            path_output=self.path_output,
+            audio_source=self.audio_source,
+        )
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        log.info(self.tr("Segment export has finished"))
+
+    def _render_segments(
+        self, todo: list[tuple[tuple[int, int], Path]], done_frames: int
+    ):
+        video_ctx = VideoContext.open(self.video_data.path)
+        fps = video_ctx.fps
+        try:
+            prerender_graph(
+                video_ctx=video_ctx,
+                aligned=self.video_data.aligned,
+                crop_rect=self.crop_rect,
+                graph_enabled=self.graph_enabled,
+                workers=resolve_workers(config.export.workers),
+            )
+        finally:
+            video_ctx.close()
+
+        job = RenderJob.create(
+            video_path=self.video_data.path,
+            data=self.video_data.data,
+            timestamps=self.video_data.aligned.timestamps,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+        )
+        workers = min(resolve_workers(config.export.workers), len(todo))
+        log.info(f"Rendering {len(todo)} segments with {workers} workers")
+
+        ctx = multiprocessing.get_context("spawn")
+        progress_queue = ctx.Queue()
+        with ctx.Pool(
+            processes=workers,
+            initializer=init_segment_worker,
+            initargs=(job, progress_queue),
+        ) as pool:
+            pending = [
+                pool.apply_async(
+                    render_segment,
+                    (
+                        start,
+                        stop,
+                        str(segment.with_name(segment.stem + ".part" + segment.suffix)),
+                        str(segment),
+                        fps,
+                        config.export.encoder(),
+                    ),
+                )
+                for (start, stop), segment in todo
+            ]
+
+            # --- FPS TRACKING ---
+            interval_start = time.perf_counter()
+            interval_frames = 0
+            while pending:
+                try:
+                    frames = progress_queue.get(timeout=0.2)
+                except queue.Empty:
+                    frames = 0
+                done_frames += frames
+                interval_frames += frames
+                if frames:
+                    self.progress_signal.emit(ProcessProgress(value=done_frames))
+
+                now = time.perf_counter()
+                if now - interval_start >= 1.0:
+                    self.fps_signal.emit(interval_frames / (now - interval_start))
+                    interval_start = now
+                    interval_frames = 0
+
+                # get() пробрасывает исключение воркера
+                for result in [r for r in pending if r.ready()]:
+                    result.get()
+                    pending.remove(result)
+
+    def _segments_key(self, bounds: list[tuple[int, int]]) -> str:
+        """
+        Хеш всего, что влияет на содержимое сегментов. Настройки скорости
+        (воркеры, размер порций, кеш предпросмотра) не входят, иначе их смена
+        выбрасывала бы готовые сегменты.
+        """
+        stat = self.path_input.stat()
+        export = config.export
+        params = {
+            "input": str(self.path_input.resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "crop_rect": self.crop_rect,
+            "graph_enabled": self.graph_enabled,
+            "bounds": bounds,
+            "operator": self.video_data.data.operator,
+            "sample": self.video_data.data.sample,
+            "overlay": config.model_dump(
+                mode="json",
+                include={
+                    "logo_enabled",
+                    "additional_text_enabled",
+                    "additional_text",
+                    "language",
+                },
+            ),
+            "graph": config.graph.model_dump(mode="json", exclude=NON_VISUAL_SETTINGS),
+            "text": config.text.model_dump(mode="json"),
+            "encoder": export.encoder().model_dump(mode="json"),
+            "source_timestamps": export.source_timestamps,
+            "output_scale": export.output_scale,
+        }
+        h = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+        data = self.video_data.data
+        for arr in (self.video_data.timestamps, data.time, data.emf, data.temp):
+            if arr is not None:
+                h.update(np.ascontiguousarray(arr).tobytes())
+        if config.logo_enabled and config.logo_img is not None:
+            h.update(np.ascontiguousarray(config.logo_img).tobytes())
+        return h.hexdigest()
+
+    def _prepare_parts_dir(self, bounds: list[tuple[int, int]]):
+        """Сохраняет готовые сегменты, только если они от того же экспорта."""
+        key = self._segments_key(bounds)
+        manifest = self.parts_dir / MANIFEST_NAME
+        if manifest.exists():
+            try:
+                if json.loads(manifest.read_text(encoding="utf-8")).get("key") == key:
+                    return
+            except (OSError, ValueError) as e:
+                log.warning(f"Broken segments manifest: {e}")
+            log.info(self.tr("Discarding segments of a different export"))
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        self.parts_dir.mkdir(parents=True)
+        manifest.write_text(json.dumps({"key": key}), encoding="utf-8")
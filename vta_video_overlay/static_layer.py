@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from vta_video_overlay.blending import blend_premultiplied
+from vta_video_overlay.opencv_frame import CVFrame, Size
+
+
+@dataclass
+class LayerRegion:
+    """Прямоугольный фрагмент слоя с ненулевой альфой."""
+    x: int
+    y: int
+    premultiplied: np.ndarray  # (h, w, 3) uint8, цвет * альфа
+    alpha: np.ndarray  # (h, w, 1) uint16, 0..255
+
+    @property
+    def rect(self) -> tuple[int, int, int, int]:
+        """Границы фрагмента на кадре (x0, y0, x1, y1)."""
+        h, w = self.alpha.shape[:2]
+        return self.x, self.y, self.x + w, self.y + h
+
+    def blend(self, image: np.ndarray, dx: int = 0, dy: int = 0):
+        """Накладывает фрагмент на кадр на месте (со сдвигом), обрезая по краям."""
+        h, w = self.alpha.shape[:2]
+        x0, y0 = self.x + dx, self.y + dy
+        fx0, fy0 = max(0, -x0), max(0, -y0)
+        fx1 = min(w, image.shape[1] - x0)
+        fy1 = min(h, image.shape[0] - y0)
+        if fx1 <= fx0 or fy1 <= fy0:
+            return
+        blend_premultiplied(
+            roi=image[y0 + fy0 : y0 + fy1, x0 + fx0 : x0 + fx1],
+            premultiplied=self.premultiplied[fy0:fy1, fx0:fx1],
+            alpha=self.alpha[fy0:fy1, fx0:fx1],
+        )
+
+
+def render_premultiplied(
+    size: Size, draw: Callable[[CVFrame], CVFrame]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Прогоняет обычную отрисовку по черному и белому кадрам: на черном
+    получается цвет * альфа, а разница белого и черного дает прозрачность.
+    Возвращает (premultiplied BGR uint8, alpha uint8).
+    """
+    shape = (size.height, size.width, 3)
+    black = draw(CVFrame(image=np.zeros(shape, np.uint8))).image
+    white = draw(CVFrame(image=np.full(shape, 255, np.uint8))).image
+
+    transparency = (white.astype(np.int16) - black).clip(0, 255)
+    # Округленное среднее по каналам в целых числах (сумма / 3)
+    alpha = 255 - (transparency.sum(axis=2, dtype=np.int16) + 1) // 3
+    return black, alpha.astype(np.uint8)
+
+
+@dataclass
+class StaticLayer:
+    """
+    Предрассчитанный слой неизменных элементов оверлея (premultiplied BGRA).
+    Хранятся только области с непрозрачными пикселями.
+    """
+    size: Size
+    regions: list[LayerRegion]
+
+    @classmethod
+    def from_drawing(
+        cls, size: Size, draw: Callable[[CVFrame], CVFrame]
+    ) -> "StaticLayer":
+        """Строит слой из обычной отрисовки, поэтому он совпадает с покадровой."""
+        black, alpha = render_premultiplied(size, draw)
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(
+            (alpha > 0).astype(np.uint8)
+        )
+        regions = []
+        # Метка 0 - прозрачный фон
+        for label in range(1, count):
+            x, y, w, h, _ = (int(v) for v in stats[label])
+            # Прямоугольники компонент могут пересекаться - берем только свои пиксели
+            own = labels[y : y + h, x : x + w, None] == label
+            regions.append(
+                LayerRegion(
+                    x=x,
+                    y=y,
+                    premultiplied=np.where(own, black[y : y + h, x : x + w], 0).astype(
+                        np.uint8
+                    ),
+                    alpha=np.where(own, alpha[y : y + h, x : x + w, None], 0).astype(
+                        np.uint16
+                    ),
+                )
+            )
+        return cls(size=size, regions=regions)
+
+    def apply(self, image: np.ndarray):
+        """Накладывает слой на кадр того же размера на месте."""
+        for region in self.regions:
+            region.blend(image)
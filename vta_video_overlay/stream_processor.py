@@ -0,0 +1,231 @@
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+from loguru import logger as log
+from PySide6 import QtCore
+
+from vta_video_overlay.config import config
+from vta_video_overlay.crop_selection_widgets import RectangleGeometry
+from vta_video_overlay.data_collections import ProcessProgress
+from vta_video_overlay.ffmpeg_pipe import FFmpegDecoder, FFmpegEncoder
+from vta_video_overlay.ffmpeg_utils import FFmpeg
+from vta_video_overlay.frame_renderer import (
+    FrameGeometry,
+    FrameRenderer,
+    prerender_graph,
+)
+from vta_video_overlay.opencv_frame import CVFrame, Size
+from vta_video_overlay.parallel_renderer import (
+    ParallelRenderer,
+    RenderJob,
+    resolve_workers,
+)
+from vta_video_overlay.video_context import VideoContext
+from vta_video_overlay.video_data import VideoData
+from vta_video_overlay.yuv_compositor import YUVCompositor, yuv_size, yuv_to_bgr
+
+# В YUV-режиме кадр для интерфейса конвертируется целиком - не на каждом кадре
+PREVIEW_INTERVAL = 10
+
+
+class StreamProcessor(QtCore.QObject):
+    """
+    Потоковый экспорт за один проход:
+    ffmpeg (декодирование) -> FrameRenderer -> ffmpeg (кодирование).
+    Промежуточные файлы не создаются.
+    """
+
+    progress_signal = QtCore.Signal(ProcessProgress)
+    fps_signal = QtCore.Signal(float)
+
+    def __init__(
+        self,
+        video_data: VideoData,
+        path_output: Path,
+        audio_source: Path | None = None,
+        crop_rect: RectangleGeometry | None = None,
+        graph_enabled: bool = True,
+    ):
+        super().__init__()
+        self.video_data = video_data
+        self.path_output = path_output
+        self.audio_source = audio_source
+        self.crop_rect = crop_rect
+        self.graph_enabled = graph_enabled
+
+    def run(self):
+        # VideoContext нужен только для метаданных (fps, размер)
+        video_ctx = VideoContext.open(self.video_data.path)
+        try:
+            prerender_graph(
+                video_ctx=video_ctx,
+                aligned=self.video_data.aligned,
+                crop_rect=self.crop_rect,
+                graph_enabled=self.graph_enabled,
+                workers=resolve_workers(config.export.workers),
+            )
+            if resolve_workers(config.export.workers) > 1:
+                self._process_parallel(video_ctx=video_ctx)
+            else:
+                self._process_sequential(video_ctx=video_ctx)
+        finally:
+            video_ctx.close()
+        log.info(self.tr("Streaming export has finished"))
+
+    def _use_native_yuv(self, video_ctx: VideoContext) -> bool:
+        if not config.export.native_yuv:
+            return False
+        geometry = FrameGeometry.create(video_ctx.width, video_ctx.height, self.crop_rect)
+        if geometry.width % 2 or geometry.height % 2:
+            log.warning(
+                f"Odd frame size {geometry.width}x{geometry.height}, "
+                "overlaying in BGR instead of YUV"
+            )
+            return False
+        return True
+
+    def _process_sequential(self, video_ctx: VideoContext):
+        native_yuv = self._use_native_yuv(video_ctx)
+        renderer = FrameRenderer(
+            video_ctx=video_ctx,
+            data=self.video_data.data,
+            timestamps=self.video_data.aligned.timestamps,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+            # Кадры YUV обрезает и масштабирует только ffmpeg
+            decoder_crop=config.export.decoder_crop or native_yuv,
+        )
+        # С decoder_crop ffmpeg сам обрезает и масштабирует кадры
+        geometry = renderer.geometry
+        if renderer.decoder_crop:
+            size, video_filter = (geometry.width, geometry.height), geometry.ffmpeg_filter()
+        else:
+            size, video_filter = (video_ctx.width, video_ctx.height), None
+        pix_fmt = "yuv420p" if native_yuv else "bgr24"
+        compositor = YUVCompositor(Size(*size)) if native_yuv else None
+        with FFmpegDecoder(
+            path=self.video_data.path,
+            width=size[0],
+            height=size[1],
+            video_filter=video_filter,
+            pix_fmt=pix_fmt,
+        ) as decoder:
+            # Лишние кадры (без таймштампа) не рендерим
+            indices = range(len(self.video_data.timestamps))
+            if compositor is not None:
+                images = (
+                    compositor.compose(
+                        img,
+                        lambda canvas, touched: renderer.render_image(
+                            canvas, idx, touched=touched
+                        ),
+                    )
+                    for idx, img in zip(indices, decoder.frames())
+                )
+            else:
+                images = (
+                    renderer.render_image(img, idx).image
+                    for idx, img in zip(indices, decoder.frames())
+                )
+            self._encode(images=images, fps=video_ctx.fps, pix_fmt=pix_fmt)
+        if compositor is not None:
+            log.debug(
+                f"YUV overlay: {len(compositor.rois)} areas, "
+                f"{compositor.redraws} redraws"
+            )
+        cache = renderer.text_cache
+        log.debug(
+            f"Text tile cache: {cache.hits} hits, {cache.misses} misses "
+            f"({cache.hit_rate:.1%})"
+        )
+        graph = renderer.graph_renderer
+        if graph is not None:
+            frames = len(self.video_data.timestamps)
+            rate = graph.renders / frames * video_ctx.fps if frames else 0.0
+            log.debug(
+                f"Graph renders: {graph.renders} for {frames} frames "
+                f"({rate:.1f} Hz effective), background redraws: {graph.redraws}"
+            )
+
+    def _process_parallel(self, video_ctx: VideoContext):
+        job = RenderJob.create(
+            video_path=self.video_data.path,
+            data=self.video_data.data,
+            timestamps=self.video_data.aligned.timestamps,
+            crop_rect=self.crop_rect,
+            graph_enabled=self.graph_enabled,
+        )
+        geometry = FrameGeometry.create(video_ctx.width, video_ctx.height, self.crop_rect)
+        with ParallelRenderer(
+            job=job,
+            workers=config.export.workers,
+            chunk_frames=config.export.chunk_frames,
+            keyframes=FFmpeg().get_keyframe_indices(self.video_data.path),
+            frame_bytes=geometry.width * geometry.height * 3,
+        ) as renderer:
+            images = renderer.frames(total_frames=len(self.video_data.timestamps))
+            self._encode(images=images, fps=video_ctx.fps)
+
+    def _encode(
+        self, images: Iterator[np.ndarray], fps: float, pix_fmt: str = "bgr24"
+    ):
+        """Пишет отрендеренные кадры (bgr24 или yuv420p) в кодировщик по порядку."""
+        encoder: FFmpegEncoder | None = None
+
+        # --- FPS TRACKING ---
+        frame_times: list[float] = []
+        fps_update_interval = 10
+
+        try:
+            frame_start = time.perf_counter()
+            for idx, image in enumerate(images):
+                if pix_fmt == "yuv420p":
+                    size = yuv_size(image)
+                    frame = (
+                        CVFrame(image=yuv_to_bgr(image))
+                        if idx % PREVIEW_INTERVAL == 0
+                        else None
+                    )
+                else:
+                    frame = CVFrame(image=image)
+                    size = frame.size
+
+                # Размер выхода известен только после кропа первого кадра
+                if encoder is None:
+                    encoder = FFmpegEncoder(
+                        path_output=self.path_output,
+                        width=size.width,
+                        height=size.height,
+                        fps=fps,
+                        encoder=config.export.encoder(),
+                        audio_source=self.audio_source,
+                        timestamps=(
+                            self.video_data.timestamps
+                            if config.export.source_timestamps
+                            else None
+                        ),
+                        pix_fmt=pix_fmt,
+                    ).start()
+                encoder.write(image)
+                self.progress_signal.emit(ProcessProgress(value=idx, frame=frame))
+
+                # Замер времени кадра (вместе с декодированием и записью)
+                now = time.perf_counter()
+                frame_times.append(now - frame_start)
+                frame_start = now
+
+                if len(frame_times) >= fps_update_interval:
+                    avg_time = sum(frame_times) / len(frame_times)
+                    current_fps = 1.0 / avg_time if avg_time > 0 else 0.0
+                    self.fps_signal.emit(current_fps)
+                    frame_times.clear()
+        except BaseException:
+            if encoder is not None:
+                encoder.abort()
+            raise
+
+        if encoder is None:
+            raise Exception(self.tr("No frames were decoded from the video."))
+        encoder.close()
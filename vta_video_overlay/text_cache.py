@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from vta_video_overlay.enums import Alignment
+from vta_video_overlay.opencv_frame import CVFrame, Size
+from vta_video_overlay.static_layer import LayerRegion, render_premultiplied
+from vta_video_overlay.text_draw import draw_text, draw_text_into, text_region
+
+# Тайлов хватает на несколько секунд меняющихся строк и все неизменные
+TEXT_CACHE_SIZE = 128
+
+
+@dataclass
+class TextTile:
+    """Отрисованная строка с фоном; координаты относительно точки привязки."""
+    region: LayerRegion | None
+    bbox: tuple[int, int, int, int]
+
+
+class TextTileCache:
+    """
+    LRU-кеш готовых строк оверлея, ключ - (шрифт, строка, выравнивание).
+    Строка растеризуется только при изменении отображаемого значения,
+    на остальных кадрах готовый тайл просто смешивается с кадром.
+    """
+
+    def __init__(self, maxsize: int = TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tiles: OrderedDict[tuple, TextTile] = OrderedDict()
+        self._style: str | None = None
+        # Строки, встреченные один раз: тайл строится со второго появления
+        self._seen: OrderedDict[tuple, None] = OrderedDict()
+
+    def set_style(self, style: str):
+        """Сбрасывает тайлы при смене настроек текста (отступы, рендерер)."""
+        if style != self._style:
+            self._tiles.clear()
+            self._seen.clear()
+            self._style = style
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def put_text(
+        self,
+        image: np.ndarray,
+        text: str,
+        xy: tuple[int, int],
+        align: Alignment,
+        small: bool = False,
+    ) -> tuple[int, int, int, int]:
+        """Как CVFrame.put_text, но из кеша. Возвращает расширенный bbox."""
+        key = (small, text, align)
+        x, y = xy
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self.hits += 1
+            self._tiles.move_to_end(key)
+        elif key in self._seen:
+            # Значение держится больше одного кадра - тайл окупится
+            self.misses += 1
+            del self._seen[key]
+            tile = self._render(text=text, align=align, small=small)
+            self._tiles[key] = tile
+            if len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
+        else:
+            # Первое появление строки рисуем сразу в кадр, без тайла
+            self.misses += 1
+            self._seen[key] = None
+            if len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+            return draw_text(image, text=text, xy=xy, align=align, small=small)
+
+        if tile.region is not None:
+            tile.region.blend(image, dx=x, dy=y)
+        x0, y0, x1, y1 = tile.bbox
+        return (x0 + x, y0 + y, x1 + x, y1 + y)
+
+    def _render(self, text: str, align: Alignment, small: bool) -> TextTile:
+        width, height, ax, ay = text_region(text=text, align=align, small=small)
+        bbox = (0, 0, 0, 0)
+
+        def draw(frame: CVFrame) -> CVFrame:
+            nonlocal bbox
+            bbox = draw_text_into(
+                frame.image, text=text, xy=(ax, ay), align=align, small=small
+            )
+            return frame
+
+        black, alpha = render_premultiplied(Size(width, height), draw)
+        rel_bbox = (bbox[0] - ax, bbox[1] - ay, bbox[2] - ax, bbox[3] - ay)
+
+        rows = np.flatnonzero(alpha.any(axis=1))
+        cols = np.flatnonzero(alpha.any(axis=0))
+        if not len(rows):
+            return TextTile(region=None, bbox=rel_bbox)
+        x0, x1 = int(cols[0]), int(cols[-1]) + 1
+        y0, y1 = int(rows[0]), int(rows[-1]) + 1
+        region = LayerRegion(
+            x=x0 - ax,
+            y=y0 - ay,
+            premultiplied=black[y0:y1, x0:x1].copy(),
+            alpha=alpha[y0:y1, x0:x1, None].astype(np.uint16),
+        )
+        return TextTile(region=region, bbox=rel_bbox)
+
@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+
+from vta_video_overlay.config import config
+from vta_video_overlay.enums import Alignment, TextRenderer
+from vta_video_overlay.opencv_frame import CVFrame
+from vta_video_overlay.pil_frame import PILFONT, PILFONTSMALL, PILFrame
+
+BBox = tuple[int, int, int, int]
+
+
+def text_region(text: str, align: Alignment, small: bool) -> tuple[int, int, int, int]:
+    """
+    Прямоугольник, в который гарантированно помещается строка с фоном:
+    (ширина, высота, x и y точки привязки внутри него).
+    """
+    font = PILFONTSMALL if small else PILFONT
+    margin = config.text.bg_padding + 8
+    _, top, _, bottom = font.getbbox(text or " ")
+    width = math.ceil(font.getlength(text)) + 2 * margin
+    height = 2 * math.ceil(bottom - top) + 2 * margin
+    right = align in (Alignment.TOP_RIGHT, Alignment.BOTTOM_RIGHT)
+    bottom_aligned = align in (Alignment.BOTTOM_LEFT, Alignment.BOTTOM_RIGHT)
+    ax = width - margin if right else margin
+    ay = height - margin if bottom_aligned else margin
+    return width, height, ax, ay
+
+
+def draw_text_into(
+    image: np.ndarray, text: str, xy: tuple[int, int], align: Alignment, small: bool
+) -> BBox:
+    """Рисует строку выбранным в настройках рендерером во весь BGR-массив на месте."""
+    if config.text.renderer == TextRenderer.ATLAS:
+        return CVFrame(image=image).put_text(text=text, xy=xy, align=align, small=small)
+    # PIL рисует только в RGB-копию переданной области
+    canvas: PILFrame = CVFrame(image=image).to_pilframe()
+    bbox = canvas.put_text(text=text, xy=xy, align=align, small=small)
+    image[:] = CVFrame.from_pilframe(frame=canvas).image
+    return bbox
+
+
+def draw_text(
+    image: np.ndarray, text: str, xy: tuple[int, int], align: Alignment, small: bool = False
+) -> BBox:
+    """
+    Рисует строку с фоном в BGR-кадр на месте, обрабатывая только ее область.
+    Возвращает расширенный bbox, как PILFrame.put_text.
+    """
+    width, height, ax, ay = text_region(text=text, align=align, small=small)
+    x, y = xy
+    x0, y0 = max(0, x - ax), max(0, y - ay)
+    x1 = min(image.shape[1], x - ax + width)
+    y1 = min(image.shape[0], y - ay + height)
+    if x1 <= x0 or y1 <= y0:
+        # Строка целиком за кадром - нужна только геометрия
+        x0, y0 = x - ax, y - ay
+        roi = np.zeros((height, width, 3), np.uint8)
+    else:
+        roi = image[y0:y1, x0:x1]
+    bbox = draw_text_into(roi, text=text, xy=(x - x0, y - y0), align=align, small=small)
+    return (bbox[0] + x0, bbox[1] + y0, bbox[2] + x0, bbox[3] + y0)
@@ -0,0 +1,12 @@
+from PySide6 import QtCore
+
+import vta_video_overlay.ui.resources_rc  # noqa: F401
+from vta_video_overlay.config import config
+
+
+def install_translator(app: QtCore.QCoreApplication) -> None:
+    """Устанавливает перевод интерфейса согласно config.language."""
+    if config.language == "Russian" or config.language == "ru":
+        translator = QtCore.QTranslator(parent=app)
+        translator.load(":/assets/translation_ru.qm")
+        app.installTranslator(translator)
@@ -1,8 +1,13 @@
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Iterator
 
 import cv2
 import numpy as np
+from loguru import logger as log
+
+from vta_video_overlay.frame_cache import FrameCache
+from vta_video_overlay.video_probe import ProbeCache
 
 
 @dataclass
@@ -13,13 +18,30 @@ class VideoContext:
     total_frames: int
     width: int
     height: int
+    # Индекс кадра, который вернет следующий cap.read() (-1 - неизвестно)
+    position: int = 0
+    # Кеш декодированных кадров (предпросмотр) и индексы ключевых кадров
+    cache: FrameCache | None = None
+    keyframes: np.ndarray | None = None
     
     @classmethod
-    def open(cls, path: str | Path) -> "VideoContext":
-        """Открывает видео и создает контекст."""
+    def open(cls, path: str | Path, cache_mb: int = 0) -> "VideoContext":
+        """
+        Открывает видео и создает контекст. С cache_mb > 0 декодированные
+        кадры кешируются, а seek идет от ближайшего ключевого кадра.
+        """
         cap = cv2.VideoCapture(str(path))
         if not cap.isOpened():
             raise RuntimeError(f"Cannot open video: {path}")
+
+        cache = keyframes = None
+        if cache_mb > 0:
+            cache = FrameCache(cache_mb)
+            try:
+                # Пробинг кешируется, поэтому повторное открытие ничего не стоит
+                keyframes = ProbeCache.get(path).keyframes
+            except Exception as e:
+                log.warning(f"No keyframe index for {path}, using plain seeks: {e}")
         
         return cls(
             cap=cap,
@@ -27,15 +49,70 @@ class VideoContext:
             total_frames=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
             width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
             height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            cache=cache,
+            keyframes=keyframes if keyframes is not None and len(keyframes) else None,
         )
     
     def read_frame(self, index: int) -> np.ndarray | None:
-        """Читает кадр по индексу."""
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        """Читает кадр по индексу. Для следующего подряд кадра seek не выполняется."""
+        if self.cache is not None:
+            img = self.cache.get(index)
+            if img is not None:
+                # Рендер рисует в кадр на месте - кеш отдает копию
+                return img.copy()
+        if index != self.position and not self._decode_up_to(index):
+            # Seek заставляет декодер начинать с ближайшего ключевого кадра
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
         ret, img = self.cap.read()
-        return img if ret else None
+        self.position = index + 1 if ret else -1
+        if not ret:
+            return None
+        if self.cache is not None:
+            self.cache.put(index, img)
+            return img.copy()
+        return img
+
+    def _decode_up_to(self, index: int) -> bool:
+        """
+        Встает перед кадром index, декодируя вперед от ближайшего ключевого
+        кадра (или от текущей позиции, если она ближе) и кешируя пройденные
+        кадры. False - индекса ключевых кадров нет, нужен обычный seek.
+        """
+        if self.keyframes is None or self.cache is None:
+            return False
+        pos = int(np.searchsorted(self.keyframes, index, side="right")) - 1
+        keyframe = int(self.keyframes[max(pos, 0)])
+        if not (keyframe <= self.position <= index):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            self.position = keyframe
+        while self.position < index:
+            ret, img = self.cap.read()
+            if not ret:
+                self.position = -1
+                return False
+            self.cache.put(self.position, img)
+            self.position += 1
+        return True
+
+    def iter_frames(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[tuple[int, np.ndarray]]:
+        """Последовательно выдает (индекс, кадр) из [start, stop) - один seek в начале."""
+        if stop is None:
+            stop = self.total_frames
+        for index in range(start, stop):
+            img = self.read_frame(index)
+            if img is None:
+                return
+            yield index, img
     
     def close(self):
         """Закрывает видео."""
+        if self.cache is not None:
+            log.debug(
+                f"Frame cache: {self.cache.hits} hits, {self.cache.misses} misses "
+                f"({self.cache.hit_rate:.1%}), {self.cache.used_bytes / 2**20:.0f} MB"
+            )
+            self.cache.clear()
         if self.cap:
             self.cap.release()
@@ -0,0 +1,396 @@
+"""
+Cached single-pass ffprobe analysis of video files
+
+Key Responsibilities:
+- Collect packet timestamps, keyframe flags, resolution, fps, codec and
+  duration of the first video stream with one ffprobe run
+- Cache results in memory and on disk under the app data folder
+- Key cache entries by file identity (path, size, mtime) so edited or
+  re-encoded files are probed again
+- Evict least recently used entries from both caches
+"""
+
+import hashlib
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from loguru import logger as log
+
+from vta_video_overlay.config import get_appdata_path
+
+PROBE_CACHE_DIR = "probe_cache"
+# Bumped when the cached fields change, so older entries are ignored
+PROBE_CACHE_VERSION = 2
+MEMORY_CACHE_SIZE = 16
+DISK_CACHE_SIZE = 64
+# Packets parsed at once from the ffprobe output
+PACKET_CHUNK = 65536
+# Packets read at the start and near the end by the quick timestamp check
+CHECK_PACKETS = 32
+CHECK_TAIL_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class VideoProbe:
+    """Metadata and packet timestamps of the first video stream."""
+
+    width: int
+    height: int
+    fps: float
+    codec: str
+    duration: float | None
+    # Packet timestamps in ms (int64), sorted (presentation order)
+    pts: np.ndarray
+    # Indices of keyframes in the sorted timestamps
+    keyframes: np.ndarray
+    # False if some packets have no timestamps (the file must be remuxed)
+    has_pts: bool
+
+
+def parse_rate(rate: str | None) -> float:
+    try:
+        return float(Fraction(rate)) if rate else 0.0
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Duration from ffprobe output; None if it is missing ("N/A")."""
+    if value is None or value == "N/A":
+        return None
+    return float(value)
+
+
+def probe_stream_info(video_path: Path) -> dict:
+    """Reads stream parameters from the container header (no packet scan)."""
+    process = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height,avg_frame_rate,r_frame_rate,codec_name,duration"
+            ":format=duration",
+            "-of",
+            "json",
+            str(video_path),
+        ],
+        capture_output=True,
+    )
+    if process.returncode != 0:
+        raise Exception(process.stderr.decode("utf-8"))
+    probe: dict = json.loads(process.stdout.decode("utf-8"))
+    streams = probe.get("streams") or []
+    if not streams:
+        raise Exception(f"Video stream not found: {video_path}")
+    info = streams[0]
+    if info.get("duration") in (None, "N/A"):
+        info["duration"] = probe.get("format", {}).get("duration")
+    return info
+
+
+def pts_to_ms(pts_time: np.ndarray) -> np.ndarray:
+    """
+    Seconds -> whole ms, truncated toward zero like int(Decimal(pts) * 1000).
+    ffprobe prints 6 decimals, so rounding to microseconds restores them exactly.
+    """
+    us = np.rint(pts_time * 1_000_000).astype(np.int64)
+    return np.sign(us) * (np.abs(us) // 1000)
+
+
+def read_packets(
+    video_path: Path, capacity: int, read_intervals: str | None = None
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Streams packet timestamps and keyframe flags from ffprobe CSV output in
+    chunks into growing int64/bool arrays, so peak memory depends on the
+    chunk size rather than on the number of packets.
+    read_intervals limits the scan (ffprobe -read_intervals syntax).
+    Returns (sorted pts in ms, keyframe indices, has_pts).
+    """
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0"]
+    if read_intervals is not None:
+        cmd += ["-read_intervals", read_intervals]
+    cmd += ["-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(video_path)]
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stdout, stderr = process.stdout, process.stderr
+    assert stdout is not None and stderr is not None
+    pts = np.empty(max(capacity, PACKET_CHUNK), dtype=np.int64)
+    keys = np.empty(len(pts), dtype=bool)
+    count = 0
+    has_pts = True
+    try:
+        chunks = pd.read_csv(
+            stdout,
+            header=None,
+            names=["pts_time", "flags"],
+            dtype={"pts_time": np.float64, "flags": str},
+            na_values=["N/A"],
+            keep_default_na=False,
+            chunksize=PACKET_CHUNK,
+        )
+        for chunk in chunks:
+            pts_time = chunk["pts_time"].to_numpy()
+            valid = ~np.isnan(pts_time)
+            if not valid.all():
+                has_pts = False
+            n = int(valid.sum())
+            if count + n > len(pts):
+                # Header estimate was too small - grow geometrically
+                new_size = max(count + n, 2 * len(pts))
+                pts = np.resize(pts, new_size)
+                keys = np.resize(keys, new_size)
+            pts[count : count + n] = pts_to_ms(pts_time[valid])
+            keys[count : count + n] = chunk["flags"].str.startswith("K").to_numpy()[valid]
+            count += n
+    except pd.errors.EmptyDataError:
+        # No packets at all
+        pass
+    finally:
+        stdout.close()
+        errors = stderr.read()
+        process.wait()
+    if process.returncode != 0:
+        raise Exception(errors.decode("utf-8"))
+
+    order = np.argsort(pts[:count], kind="stable")
+    return pts[:count][order], np.flatnonzero(keys[:count][order]), has_pts
+
+
+def sample_has_pts(video_path: Path, duration: float | None) -> bool:
+    """
+    Checks packet timestamps only in the first packets and in a few packets
+    near the end, so the answer does not depend on the file length.
+    """
+    head = f"%+#{CHECK_PACKETS}"
+    intervals = [head]
+    if duration and duration > CHECK_TAIL_SECONDS:
+        intervals.append(f"{duration - CHECK_TAIL_SECONDS:.3f}%+#{CHECK_PACKETS}")
+    for interval in intervals:
+        try:
+            _, _, has_pts = read_packets(video_path, 0, read_intervals=interval)
+        except Exception as e:
+            if interval == head:
+                raise
+            # Unseekable streams (e.g. raw elementary streams): the start is enough
+            log.debug(f"Skipped timestamp check near the end: {e}")
+            continue
+        if not has_pts:
+            return False
+    return True
+
+
+def count_frames(video_path: Path) -> tuple[int, int]:
+    """
+    Counts packets and decoded frames of the first video stream.
+    Decodes the whole stream, so it is only used to validate repaired files.
+    Returns (packets, frames).
+    """
+    process = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-count_packets",
+            "-count_frames",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=nb_read_packets,nb_read_frames",
+            "-of",
+            "json",
+            str(video_path),
+        ],
+        capture_output=True,
+    )
+    if process.returncode != 0:
+        raise Exception(process.stderr.decode("utf-8"))
+    streams = json.loads(process.stdout.decode("utf-8")).get("streams") or []
+    if not streams:
+        raise Exception(f"Video stream not found: {video_path}")
+    return int(streams[0]["nb_read_packets"]), int(streams[0]["nb_read_frames"])
+
+
+def run_probe(video_path: Path) -> VideoProbe:
+    """Reads the header and then scans all packets of the first video stream."""
+    info = probe_stream_info(video_path)
+    fps = parse_rate(info.get("avg_frame_rate")) or parse_rate(info.get("r_frame_rate"))
+    duration = parse_duration(info.get("duration"))
+    # Preallocate for the expected number of packets (with a small reserve)
+    capacity = int(duration * fps * 1.05) + 1 if duration and fps else 0
+    pts, keyframes, has_pts = read_packets(video_path, capacity)
+    return VideoProbe(
+        width=int(info["width"]),
+        height=int(info["height"]),
+        fps=fps,
+        codec=info.get("codec_name", ""),
+        duration=duration,
+        pts=pts,
+        keyframes=keyframes,
+        has_pts=has_pts,
+    )
+
+
+class ProbeCache:
+    """Singleton cache of VideoProbe results (memory LRU + disk LRU)"""
+
+    _memory: OrderedDict[str, VideoProbe] = OrderedDict()
+    _lock = threading.Lock()
+    # Full probes running in background threads (see prefetch)
+    _prefetching: dict[str, threading.Thread] = {}
+
+    @staticmethod
+    def file_key(video_path: Path) -> str:
+        """Identity of the file contents: path, size and modification time."""
+        stat = video_path.stat()
+        identity = f"{PROBE_CACHE_VERSION}|{video_path}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    @staticmethod
+    def cache_dir() -> Path:
+        path = get_appdata_path() / PROBE_CACHE_DIR
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @classmethod
+    def _resolve(cls, video_path: Path | str) -> tuple[Path, str]:
+        video_path = Path(video_path).resolve()
+        if not video_path.is_file():
+            raise FileNotFoundError(f'Invalid path for the video file: "{video_path}"')
+        return video_path, cls.file_key(video_path)
+
+    @classmethod
+    def _cached(cls, key: str) -> VideoProbe | None:
+        """Result from memory or disk, without running ffprobe."""
+        with cls._lock:
+            probe = cls._memory.get(key)
+            if probe is not None:
+                cls._memory.move_to_end(key)
+                return probe
+        probe = cls._load(key)
+        if probe is not None:
+            cls._remember(key, probe)
+        return probe
+
+    @classmethod
+    def _remember(cls, key: str, probe: VideoProbe):
+        with cls._lock:
+            cls._memory[key] = probe
+            if len(cls._memory) > MEMORY_CACHE_SIZE:
+                cls._memory.popitem(last=False)
+
+    @classmethod
+    def get(cls, video_path: Path | str) -> VideoProbe:
+        """
+        Returns the probe of the file, running ffprobe only on a cache miss.
+        If a background probe of the file is running, waits for it instead.
+        """
+        video_path, key = cls._resolve(video_path)
+        with cls._lock:
+            pending = cls._prefetching.get(key)
+        if pending is not None and pending is not threading.current_thread():
+            pending.join()
+        return cls._probe(video_path, key)
+
+    @classmethod
+    def _probe(cls, video_path: Path, key: str) -> VideoProbe:
+        probe = cls._cached(key)
+        if probe is None:
+            log.debug(f"Probing {video_path}")
+            probe = run_probe(video_path)
+            cls._save(key, probe)
+            cls._remember(key, probe)
+        return probe
+
+    @classmethod
+    def prefetch(cls, video_path: Path | str):
+        """
+        Starts the full packet scan in a background thread, so it is usually
+        cached by the time the export needs it. Does nothing if the probe is
+        already cached in memory or running.
+        """
+        video_path, key = cls._resolve(video_path)
+        with cls._lock:
+            if key in cls._memory or key in cls._prefetching:
+                return
+            thread = threading.Thread(
+                target=cls._prefetch_run, args=(video_path, key), daemon=True
+            )
+            cls._prefetching[key] = thread
+        thread.start()
+
+    @classmethod
+    def _prefetch_run(cls, video_path: Path, key: str):
+        try:
+            cls._probe(video_path, key)
+        except Exception as e:
+            log.warning(f"Background probe of {video_path} failed: {e}")
+        finally:
+            with cls._lock:
+                cls._prefetching.pop(key, None)
+
+    @classmethod
+    def has_timestamps(cls, video_path: Path | str) -> bool:
+        """
+        Whether packets have timestamps. Uses a cached full probe if there is
+        one, otherwise only samples packets (no full scan).
+        """
+        video_path, key = cls._resolve(video_path)
+        probe = cls._cached(key)
+        if probe is not None:
+            return probe.has_pts
+        duration = parse_duration(probe_stream_info(video_path).get("duration"))
+        return sample_has_pts(video_path, duration)
+
+    @classmethod
+    def _load(cls, key: str) -> VideoProbe | None:
+        path = cls.cache_dir() / f"{key}.npz"
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as stored:
+                meta = json.loads(str(stored["meta"]))
+                probe = VideoProbe(
+                    **meta, pts=stored["pts"], keyframes=stored["keyframes"]
+                )
+            # Access time for LRU eviction
+            path.touch()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning(f"Broken probe cache entry {path.name}: {e}")
+            return None
+        return probe
+
+    @classmethod
+    def _save(cls, key: str, probe: VideoProbe):
+        cache_dir = cls.cache_dir()
+        path = cache_dir / f"{key}.npz"
+        part = path.with_suffix(".part")
+        meta = {
+            f.name: getattr(probe, f.name)
+            for f in fields(probe)
+            if f.name not in ("pts", "keyframes")
+        }
+        try:
+            with open(part, "wb") as f:
+                np.savez(
+                    f, meta=json.dumps(meta), pts=probe.pts, keyframes=probe.keyframes
+                )
+            part.replace(path)
+            entries = sorted(cache_dir.glob("*.npz"), key=lambda p: p.stat().st_mtime)
+            for old in entries[:-DISK_CACHE_SIZE]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            log.warning(f"Failed to save probe cache entry: {e}")
@@ -0,0 +1,172 @@
+"""
+Наложение оверлея на кадры yuv420p без конвертации кадра целиком.
+Оверлей занимает малую часть кадра, поэтому в BGR переводятся только
+области, которых он касается (текст, график, логотип), после отрисовки
+обратно в Y/U/V записываются только изменившиеся пиксели. Остальной кадр
+идет от декодера к кодировщику без пересчета цвета.
+"""
+
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from vta_video_overlay.opencv_frame import Size
+
+Rect = tuple[int, int, int, int]  # x0, y0, x1, y1
+# Запас вокруг bbox строк: чернила глифов могут выходить за фон
+ROI_MARGIN = 8
+
+
+def yuv_size(frame: np.ndarray) -> Size:
+    """Размер изображения кадра в раскладке I420 (H * 3 / 2, W)."""
+    return Size(frame.shape[1], frame.shape[0] * 2 // 3)
+
+
+def yuv_planes(frame: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Представления плоскостей Y (H, W), U и V (H / 2, W / 2) без копирования."""
+    width, height = yuv_size(frame)
+    flat = frame.reshape(-1)
+    luma = width * height
+    chroma = luma // 4
+    return (
+        flat[:luma].reshape(height, width),
+        flat[luma : luma + chroma].reshape(height // 2, width // 2),
+        flat[luma + chroma :].reshape(height // 2, width // 2),
+    )
+
+
+def yuv_to_bgr(frame: np.ndarray) -> np.ndarray:
+    """Весь кадр в BGR (только для показа в интерфейсе)."""
+    return cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)
+
+
+def align_rect(rect: Rect, size: Size, margin: int = 0) -> Rect | None:
+    """Прямоугольник с запасом, по четным границам (блоки цветности 2x2), в пределах кадра."""
+    x0, y0, x1, y1 = rect
+    x0 = max(0, (x0 - margin) // 2 * 2)
+    y0 = max(0, (y0 - margin) // 2 * 2)
+    x1 = min(size.width, -(-(x1 + margin) // 2) * 2)
+    y1 = min(size.height, -(-(y1 + margin) // 2) * 2)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+def _overlaps(a: Rect, b: Rect) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and inner[2] <= outer[2]
+        and inner[3] <= outer[3]
+    )
+
+
+class YUVCompositor:
+    """
+    Рисует оверлей на BGR-холсте размера кадра, где актуальны только области
+    оверлея (ROI), и переносит результат в плоскости yuv420p.
+    Набор ROI заранее не известен (ширина строк зависит от значений), поэтому
+    он растет по ходу: если оверлей коснулся пикселей вне ROI, область
+    добавляется и кадр рисуется заново. Перерисовки нужны лишь на первых
+    кадрах и при удлинении строк.
+    """
+
+    def __init__(self, size: Size):
+        self.size = size
+        # Вне ROI содержимое холста не используется
+        self.canvas = np.zeros((size.height, size.width, 3), np.uint8)
+        self.rois: list[Rect] = []
+        # Кадры, нарисованные повторно из-за новой области
+        self.redraws = 0
+
+    def compose(
+        self, frame: np.ndarray, draw: Callable[[np.ndarray, list[Rect]], object]
+    ) -> np.ndarray:
+        """
+        Накладывает оверлей на кадр I420 на месте.
+        draw(canvas, touched) рисует оверлей в BGR-холст и добавляет в touched
+        прямоугольники измененных областей; ее результат не используется.
+        """
+        planes = yuv_planes(frame)
+        while True:
+            originals = [self._load(planes, roi) for roi in self.rois]
+            touched: list[Rect] = []
+            draw(self.canvas, touched)
+            missing = [
+                rect
+                for rect in (align_rect(r, self.size, ROI_MARGIN) for r in touched)
+                if rect is not None
+                and not any(_contains(roi, rect) for roi in self.rois)
+            ]
+            if not missing:
+                break
+            for rect in missing:
+                self._add_roi(rect)
+            self.redraws += 1
+        for roi, original in zip(self.rois, originals):
+            self._store(planes, roi, original)
+        return frame
+
+    def _add_roi(self, rect: Rect):
+        """Добавляет область, сливая ее с пересекающимися."""
+        merged = True
+        while merged:
+            merged = False
+            for roi in self.rois:
+                if _overlaps(roi, rect):
+                    self.rois.remove(roi)
+                    rect = (
+                        min(roi[0], rect[0]),
+                        min(roi[1], rect[1]),
+                        max(roi[2], rect[2]),
+                        max(roi[3], rect[3]),
+                    )
+                    merged = True
+                    break
+        self.rois.append(rect)
+
+    def _load(self, planes, roi: Rect) -> np.ndarray:
+        """Переводит область кадра в BGR на холст. Возвращает копию до отрисовки."""
+        y_plane, u_plane, v_plane = planes
+        x0, y0, x1, y1 = roi
+        w, h = x1 - x0, y1 - y0
+        i420 = np.concatenate(
+            (
+                y_plane[y0:y1, x0:x1].reshape(-1),
+                u_plane[y0 // 2 : y1 // 2, x0 // 2 : x1 // 2].reshape(-1),
+                v_plane[y0 // 2 : y1 // 2, x0 // 2 : x1 // 2].reshape(-1),
+            )
+        ).reshape(h * 3 // 2, w)
+        bgr = cv2.cvtColor(i420, cv2.COLOR_YUV2BGR_I420)
+        self.canvas[y0:y1, x0:x1] = bgr
+        return bgr
+
+    def _store(self, planes, roi: Rect, original: np.ndarray):
+        """Записывает в кадр только пиксели области, измененные оверлеем."""
+        y_plane, u_plane, v_plane = planes
+        x0, y0, x1, y1 = roi
+        w, h = x1 - x0, y1 - y0
+        bgr = self.canvas[y0:y1, x0:x1]
+        # Маска измененных пикселей: OR разностей каналов (быстрее ufunc.any)
+        diff = cv2.split(cv2.absdiff(bgr, original))
+        changed = cv2.bitwise_or(cv2.bitwise_or(diff[0], diff[1]), diff[2])
+        if not cv2.countNonZero(changed):
+            return
+        i420 = cv2.cvtColor(np.ascontiguousarray(bgr), cv2.COLOR_BGR2YUV_I420).reshape(-1)
+        luma = w * h
+        new_y = i420[:luma].reshape(h, w)
+        new_u = i420[luma : luma * 5 // 4].reshape(h // 2, w // 2)
+        new_v = i420[luma * 5 // 4 :].reshape(h // 2, w // 2)
+        np.copyto(y_plane[y0:y1, x0:x1], new_y, where=changed.astype(bool))
+        # Цветность общая на блок 2x2 - обновляется, если изменился любой его пиксель
+        block = cv2.bitwise_or(
+            cv2.bitwise_or(changed[0::2, 0::2], changed[0::2, 1::2]),
+            cv2.bitwise_or(changed[1::2, 0::2], changed[1::2, 1::2]),
+        ).astype(bool)
+        np.copyto(u_plane[y0 // 2 : y1 // 2, x0 // 2 : x1 // 2], new_u, where=block)
+        np.copyto(v_plane[y0 // 2 : y1 // 2, x0 // 2 : x1 // 2], new_v, where=block)